@@ -0,0 +1,68 @@
+from collections import defaultdict
+from typing import Any, Callable
+
+
+class AdjacencyList(defaultdict):
+    """
+    The adjacency list built by buildAdjacencyList: a defaultdict mapping each (x, y) node to the list of its
+    neighbours, which can also hold what the graph builder worked out about the maze.
+
+    width and height are the size of the maze in characters. components holds the ComponentIndex of the maze once
+    it has been labelled (see components.getComponentIndex), None until then. derived holds the structures the
+    solvers build from the graph (see getDerived).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.width = None
+        self.height = None
+        self.components = None
+        self.derived = {}
+
+
+def getDerived(graph, name: str, build: Callable[[Any], Any]) -> Any:
+    """
+    Returns a structure built from a maze graph, such as its contracted graph or landmark table, building it with
+    build(graph) on the first call and reusing it afterwards.
+
+    The structure is kept in the derived dictionary of the graph (AdjacencyList, CSRGraph and LazyMazeGraph all have
+    one), so it is released along with the graph. Graphs without one, such as a plain dict, have it built every time.
+
+    Args:
+        graph: The graph of the maze.
+        name (str): The name the structure is kept under.
+        build (Callable): Builds the structure from the graph.
+
+    Returns:
+        The structure.
+    """
+    derived = getattr(graph, "derived", None)
+    if derived is None:
+        return build(graph)
+    value = derived.get(name)
+    if value is None:
+        value = derived[name] = build(graph)
+    return value
+
+
+def setDerived(graph, name: str, value: Any) -> None:
+    """
+    Keeps a structure built from a maze graph, such as one loaded from the cache directory, for getDerived to return.
+    """
+    derived = getattr(graph, "derived", None)
+    if derived is not None:
+        derived[name] = value
+
+
+def forgetDerived(graph, *names: str) -> None:
+    """
+    Forgets the named structures built from a maze graph, or every one of them if no names are given, for instance
+    once the graph has changed or is no longer needed.
+    """
+    derived = getattr(graph, "derived", None)
+    if derived is None:
+        return
+    if not names:
+        derived.clear()
+    for name in names:
+        derived.pop(name, None)
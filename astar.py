@@ -1,8 +1,11 @@
 from heapq import heappush, heappop
-from typing import Dict, List, Tuple
+from typing import Dict, Generator, List, Tuple
 from collections import defaultdict
+from array import array
+from csrgraph import CSRGraph
+from instrumentation import Progress, SearchMetrics
 
-def aStarSolver(adjacencyList: Dict[str, List[str]], root: str, goal: str) -> Tuple[Dict[str, str], int]:
+def aStarSolver(adjacencyList: Dict[str, List[str]], root: str, goal: str, metrics: SearchMetrics = None) -> Tuple[Dict[str, str], int]:
 	"""
 	A* algorithm implementation to find the shortest path between two nodes in a graph.
 
@@ -10,6 +13,7 @@ def aStarSolver(adjacencyList: Dict[str, List[str]], root: str, goal: str) -> Tu
 		adjacencyList (dictionary of list): a dictionary that maps each node in the graph to a list of its adjacent nodes.
 		root (tuple): the node to start the search from.
 		goal (tuple): the node to search for.
+		metrics (SearchMetrics, optional): if given, the heap pushes, stale pops, peak heap size and heuristic cache hits are counted into it.
 
 	Returns:
 		If the goal node is found, returns a tuple containing a dictionary that maps each visited node to its parent in the search tree, and the number of nodes explored during the traversal.
@@ -17,6 +21,11 @@ def aStarSolver(adjacencyList: Dict[str, List[str]], root: str, goal: str) -> Tu
 	"""
 
 
+	# Only count metrics when asked to, so the uninstrumented search pays a single check per step.
+	instrument = metrics is not None
+	if instrument:
+		expanded = set()
+
 	# Set the heuristic multiplier.
 	multiplier = .8
 
@@ -33,6 +42,9 @@ def aStarSolver(adjacencyList: Dict[str, List[str]], root: str, goal: str) -> Tu
 
 	# Enqueue the root with a priority of 0.
 	heappush(prioQueue, (0, root))
+	if instrument:
+		metrics.pushes += 1
+		metrics.peakFrontier = max(metrics.peakFrontier, 1)
 
 	# Keep track of the number of nodes explored.
 	nodesExplored = 0
@@ -46,7 +58,13 @@ def aStarSolver(adjacencyList: Dict[str, List[str]], root: str, goal: str) -> Tu
 		# Extract the node with the lowest priority.
 		_, current = heappop(prioQueue)
 		nodesExplored += 1
-	
+
+		if instrument:
+			metrics.pops += 1
+			if current in expanded:
+				metrics.stalePops += 1
+			expanded.add(current)
+
 		# If the current node is the goal, return the shortest path.
 		if current == goal:
 			return cameFrom, nodesExplored
@@ -64,10 +82,14 @@ def aStarSolver(adjacencyList: Dict[str, List[str]], root: str, goal: str) -> Tu
 				if neighbor in heuristicCache:
 					# Use the cached value.
 					heuristic_value = heuristicCache[neighbor]
+					if instrument:
+						metrics.heuristicCacheHits += 1
 				else:
 					# Calculate the heuristic value and cache it.
 					heuristic_value = heuristic(neighbor, goal, multiplier)
 					heuristicCache[neighbor] = heuristic_value
+					if instrument:
+						metrics.heuristicCacheMisses += 1
 
 				# Calculate the priority of the neighbor as the sum of the tentative distance and the heuristic distance to the goal.
 				priority = tentative_distance + heuristic_value
@@ -76,6 +98,76 @@ def aStarSolver(adjacencyList: Dict[str, List[str]], root: str, goal: str) -> Tu
 				# Set the parent of the neighbor to the current node.
 				cameFrom[neighbor] = current
 
+				if instrument:
+					metrics.pushes += 1
+					metrics.peakFrontier = max(metrics.peakFrontier, len(prioQueue))
+
+	# If there is no path from the root to the goal, return None for the path and the number of nodes explored.
+	return None, nodesExplored
+
+
+def aStarSolverSteps(adjacencyList: Dict[str, List[str]], root: str, goal: str, every: int = 1000) -> Generator[Progress, None, Tuple[Dict[str, str], int]]:
+	"""
+	A steppable version of aStarSolver, which pauses every `every` expansions so the caller can report progress,
+	enforce a deadline or give up on the search (see stepping.py).
+
+	Args:
+		adjacencyList (dictionary of list): a dictionary that maps each node in the graph to a list of its adjacent nodes.
+		root (tuple): the node to start the search from.
+		goal (tuple): the node to search for.
+		every (int): the number of nodes to explore between pauses.
+
+	Yields:
+		Progress: the number of nodes explored so far and the size of the priority queue.
+
+	Returns:
+		The same result as aStarSolver, as the value of the StopIteration that ends the generator.
+	"""
+
+	# Set the heuristic multiplier.
+	multiplier = .8
+
+	# Distances from the root, parents, the priority queue and the heuristic cache, as in aStarSolver.
+	distance = defaultdict(lambda: float('inf'))
+	distance[root] = heuristic(root, goal, multiplier)
+	cameFrom = {root: None}
+	prioQueue = [(0, root)]
+	heuristicCache = {}
+
+	# Keep track of the number of nodes explored.
+	nodesExplored = 0
+
+	# While there are nodes in the heap.
+	while prioQueue:
+		# Extract the node with the lowest priority.
+		_, current = heappop(prioQueue)
+		nodesExplored += 1
+
+		# If the current node is the goal, return the shortest path.
+		if current == goal:
+			return cameFrom, nodesExplored
+
+		# Pause so the caller can check on the search.
+		if nodesExplored % every == 0:
+			yield Progress(nodesExplored, len(prioQueue))
+
+		# For each neighbor of the current node.
+		for neighbor in adjacencyList[current]:
+			tentative_distance = distance[current] + 1
+
+			# If the tentative distance is less than the current distance to the neighbor, update the distance.
+			if tentative_distance < distance[neighbor]:
+				distance[neighbor] = tentative_distance
+
+				# Use the cached heuristic value, calculating it on first use.
+				heuristic_value = heuristicCache.get(neighbor)
+				if heuristic_value is None:
+					heuristic_value = heuristicCache[neighbor] = heuristic(neighbor, goal, multiplier)
+
+				# Enqueue the neighbor and set its parent to the current node.
+				heappush(prioQueue, (tentative_distance + heuristic_value, neighbor))
+				cameFrom[neighbor] = current
+
 	# If there is no path from the root to the goal, return None for the path and the number of nodes explored.
 	return None, nodesExplored
 
@@ -92,4 +184,287 @@ def heuristic(current: Tuple[int, int], goal: Tuple[int, int], m: int = 1) -> in
 	Returns:
 		int: The calculated heuristic value.
 	"""
-	return (abs(current[0] - goal[0]) + abs(current[1] - goal[1])) * m
\ No newline at end of file
+	return (abs(current[0] - goal[0]) + abs(current[1] - goal[1])) * m
+
+
+def aStarSolverCSR(graph: CSRGraph, root: int, goal: int) -> Tuple[array, int]:
+	"""
+	A* algorithm implementation that runs directly on a CSRGraph.
+
+	Distances and parents are kept in flat arrays indexed by node id instead of dictionaries keyed by coordinates.
+
+	Args:
+		graph (CSRGraph): the compact graph representation of the maze.
+		root (int): the id of the node to start the search from.
+		goal (int): the id of the node to search for.
+
+	Returns:
+		If the goal node is found, returns a tuple containing an array that maps each node id to the id of its parent in the search tree (-1 if it has none), and the number of nodes explored during the traversal.
+		If the goal node is not found, returns a tuple containing None for the parent array, and the number of nodes explored during the traversal.
+	"""
+
+	# Set the heuristic multiplier.
+	multiplier = .8
+
+	# Bind the graph arrays locally to avoid attribute lookups in the loop.
+	xs, ys, offsets, targets = graph.xs, graph.ys, graph.offsets, graph.targets
+	goalX, goalY = xs[goal], ys[goal]
+
+	# Flat arrays holding the distance from the root and the parent of every node.
+	distance = array("d", [float('inf')]) * len(graph)
+	distance[root] = heuristic((xs[root], ys[root]), (goalX, goalY), multiplier)
+	cameFrom = array("i", [-1]) * len(graph)
+
+	# Create a binary heap priority queue and enqueue the root with a priority of 0.
+	prioQueue = [(0, root)]
+
+	# Keep track of the number of nodes explored.
+	nodesExplored = 0
+
+	# While there are nodes in the heap.
+	while prioQueue:
+		# Extract the node with the lowest priority.
+		_, current = heappop(prioQueue)
+		nodesExplored += 1
+
+		# If the current node is the goal, return the parent array.
+		if current == goal:
+			return cameFrom, nodesExplored
+
+		tentative_distance = distance[current] + 1
+
+		# For each neighbor of the current node.
+		for k in range(offsets[current], offsets[current + 1]):
+			neighbor = targets[k]
+
+			# If the tentative distance is less than the current distance to the neighbor, update the distance.
+			if tentative_distance < distance[neighbor]:
+				distance[neighbor] = tentative_distance
+
+				# The Manhattan distance is computed straight from the coordinate arrays, so no cache is needed.
+				priority = tentative_distance + (abs(xs[neighbor] - goalX) + abs(ys[neighbor] - goalY)) * multiplier
+				heappush(prioQueue, (priority, neighbor))
+				cameFrom[neighbor] = current
+
+	# If there is no path from the root to the goal, return None for the parents and the number of nodes explored.
+	return None, nodesExplored
+
+
+def cellDistance(current: Tuple[int, int], goal: Tuple[int, int]) -> int:
+	"""
+	Calculate the Manhattan distance between two nodes in steps between cells.
+
+	Cells sit on every other column, so a horizontal step moves 2 columns. Unlike heuristic with the default
+	multiplier this never overestimates the number of steps left, so it is an admissible and consistent heuristic.
+
+	Args:
+		current (Tuple[int, int]): The current node.
+		goal (Tuple[int, int]): The goal node.
+
+	Returns:
+		int: The number of cell steps between the two nodes if there were no walls.
+	"""
+	return abs(current[0] - goal[0]) // 2 + abs(current[1] - goal[1])
+
+
+def aStarSolverBucket(adjacencyList: Dict[str, List[str]], root: str, goal: str, metrics: SearchMetrics = None) -> Tuple[Dict[str, str], int]:
+	"""
+	A* algorithm implementation using a bucket priority queue and a closed set.
+
+	Edges all cost 1 and the heuristic is cellDistance, the Manhattan distance in steps between cells, so every
+	priority f (distance + cellDistance) is a small integer which indexes a list of buckets. Pushing and popping a
+	node is then O(1) instead of O(log n). Each bucket is split again by cellDistance h, and the node with the
+	smallest h (the largest distance) is popped first, last in, first out among equal h. Among the many nodes which
+	share a priority this follows the one closest to the goal, so the search runs down one promising corridor
+	instead of widening every corridor of that priority at once.
+
+	Each step changes cellDistance by exactly 1, so the heuristic is consistent: a neighbour either keeps the
+	priority of the node expanded with an h one smaller, or lands two buckets higher. The outer cursor only moves
+	forward and a node's distance is final once it is expanded. Expanded nodes are therefore closed and never pushed
+	or expanded again, a node left in a bucket after its distance improved is skipped without being counted, and the
+	path returned is a shortest one.
+
+	Args:
+		adjacencyList (dictionary of list): a dictionary that maps each node in the graph to a list of its adjacent nodes.
+		root (tuple): the node to start the search from.
+		goal (tuple): the node to search for.
+		metrics (SearchMetrics, optional): if given, the bucket pushes, stale pops and peak frontier size are counted into it.
+
+	Returns:
+		If the goal node is found, returns a tuple containing a dictionary that maps each visited node to its parent in the search tree, and the number of nodes explored during the traversal.
+		If the goal node is not found, returns a tuple containing None for the path dictionary, and the number of nodes explored during the traversal.
+	"""
+
+	# Only count metrics when asked to, so the uninstrumented search pays a single check per step.
+	instrument = metrics is not None
+	if instrument:
+		frontier = 1
+		metrics.pushes += 1
+		metrics.peakFrontier = max(metrics.peakFrontier, 1)
+
+	goalX, goalY = goal
+
+	# Distances from the root and parents of the nodes reached so far, and the set of expanded nodes.
+	distance = {root: 0}
+	cameFrom = {root: None}
+	closed = set()
+
+	# Buckets of nodes indexed by their priority, each a dictionary of sub-buckets keyed by h, alongside a heap of
+	# the h values each bucket holds. The heuristic never drops by more than an edge costs, so no neighbour lands in
+	# a bucket below the current one.
+	cursor = cellDistance(root, goal)
+	buckets = [{} for _ in range(cursor + 1)]
+	heights = [[] for _ in range(cursor + 1)]
+	buckets[cursor][cursor] = [root]
+	heights[cursor].append(cursor)
+
+	# Keep track of the number of nodes explored.
+	nodesExplored = 0
+
+	# While there are buckets left to empty.
+	while cursor < len(buckets):
+		hs = heights[cursor]
+		if not hs:
+			cursor += 1
+			continue
+
+		# Take the most recently added node with the lowest priority and, among those, the lowest h, dropping the
+		# sub-bucket once it is empty.
+		level = buckets[cursor]
+		bucket = level[hs[0]]
+		current = bucket.pop()
+		if not bucket:
+			del level[heappop(hs)]
+
+		if instrument:
+			metrics.pops += 1
+			frontier -= 1
+
+		# Skip nodes which were expanded through a shorter path after being added to this bucket.
+		if current in closed:
+			if instrument:
+				metrics.stalePops += 1
+			continue
+		closed.add(current)
+		nodesExplored += 1
+
+		# If the current node is the goal, return the shortest path.
+		if current == goal:
+			return cameFrom, nodesExplored
+
+		tentative_distance = distance[current] + 1
+
+		# For each neighbor of the current node which has not been expanded yet.
+		for neighbor in adjacencyList[current]:
+			if neighbor in closed or tentative_distance >= distance.get(neighbor, tentative_distance + 1):
+				continue
+			distance[neighbor] = tentative_distance
+			cameFrom[neighbor] = current
+
+			# Add the neighbor to the sub-bucket for its priority and h, growing the bucket lists if needed.
+			h = abs(neighbor[0] - goalX) // 2 + abs(neighbor[1] - goalY)
+			key = tentative_distance + h
+			while len(buckets) <= key:
+				buckets.append({})
+				heights.append([])
+			bucket = buckets[key].get(h)
+			if bucket is None:
+				buckets[key][h] = [neighbor]
+				heappush(heights[key], h)
+			else:
+				bucket.append(neighbor)
+
+			if instrument:
+				metrics.pushes += 1
+				frontier += 1
+				metrics.peakFrontier = max(metrics.peakFrontier, frontier)
+
+	# If there is no path from the root to the goal, return None for the path and the number of nodes explored.
+	return None, nodesExplored
+
+
+def aStarSolverBucketCSR(graph: CSRGraph, root: int, goal: int) -> Tuple[array, int]:
+	"""
+	The bucket queue A* of aStarSolverBucket running directly on a CSRGraph.
+
+	Distances and parents are kept in flat arrays indexed by node id, and the closed set is a bytearray.
+
+	Args:
+		graph (CSRGraph): the compact graph representation of the maze.
+		root (int): the id of the node to start the search from.
+		goal (int): the id of the node to search for.
+
+	Returns:
+		If the goal node is found, returns a tuple containing an array that maps each node id to the id of its parent in the search tree (-1 if it has none), and the number of nodes explored during the traversal.
+		If the goal node is not found, returns a tuple containing None for the parent array, and the number of nodes explored during the traversal.
+	"""
+
+	# Bind the graph arrays locally to avoid attribute lookups in the loop.
+	xs, ys, offsets, targets = graph.xs, graph.ys, graph.offsets, graph.targets
+	goalX, goalY = xs[goal], ys[goal]
+
+	# Flat arrays holding the distance from the root, the parent and whether each node has been expanded.
+	unreached = len(graph) + 1
+	distance = array("i", [unreached]) * len(graph)
+	distance[root] = 0
+	cameFrom = array("i", [-1]) * len(graph)
+	closed = bytearray(len(graph))
+
+	# Buckets of node ids indexed by their priority, each a dictionary of sub-buckets keyed by h, alongside a heap of
+	# the h values each bucket holds.
+	cursor = abs(xs[root] - goalX) // 2 + abs(ys[root] - goalY)
+	buckets = [{} for _ in range(cursor + 1)]
+	heights = [[] for _ in range(cursor + 1)]
+	buckets[cursor][cursor] = [root]
+	heights[cursor].append(cursor)
+
+	# Keep track of the number of nodes explored.
+	nodesExplored = 0
+
+	# While there are buckets left to empty.
+	while cursor < len(buckets):
+		hs = heights[cursor]
+		if not hs:
+			cursor += 1
+			continue
+
+		# Take the most recently added node with the lowest priority and h, skipping nodes already expanded.
+		level = buckets[cursor]
+		bucket = level[hs[0]]
+		current = bucket.pop()
+		if not bucket:
+			del level[heappop(hs)]
+		if closed[current]:
+			continue
+		closed[current] = 1
+		nodesExplored += 1
+
+		# If the current node is the goal, return the parent array.
+		if current == goal:
+			return cameFrom, nodesExplored
+
+		tentative_distance = distance[current] + 1
+
+		# For each neighbor of the current node which has not been expanded yet.
+		for k in range(offsets[current], offsets[current + 1]):
+			neighbor = targets[k]
+			if closed[neighbor] or tentative_distance >= distance[neighbor]:
+				continue
+			distance[neighbor] = tentative_distance
+			cameFrom[neighbor] = current
+
+			# Add the neighbor to the sub-bucket for its priority and h, growing the bucket lists if needed.
+			h = abs(xs[neighbor] - goalX) // 2 + abs(ys[neighbor] - goalY)
+			key = tentative_distance + h
+			while len(buckets) <= key:
+				buckets.append({})
+				heights.append([])
+			bucket = buckets[key].get(h)
+			if bucket is None:
+				buckets[key][h] = [neighbor]
+				heappush(heights[key], h)
+			else:
+				bucket.append(neighbor)
+
+	# If there is no path from the root to the goal, return None for the parents and the number of nodes explored.
+	return None, nodesExplored
@@ -0,0 +1,259 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from time import perf_counter_ns
+from typing import Dict, List
+
+from adjacency import forgetDerived
+from astar import aStarSolver, aStarSolverBucket
+from contraction import getContractedGraph
+from csrgraph import verifyGraph
+from dfs import depthFirstSearch
+from instrumentation import SearchMetrics
+from landmarks import getLandmarks
+from main import (ALGORITHMS, BACKENDS, buildAdjacencyList, buildGraph, buildPath, findEndpoints, findMazeFiles, readMaze,
+                  readMazeFile, selectSolver)
+
+
+def percentile(values: List[int], p: float) -> float:
+    """
+    Returns the p-th percentile of a list of values, interpolating linearly between the closest ranks.
+
+    Args:
+        values (list[int]): The measured values.
+        p (float): The percentile to compute, between 0 and 100.
+
+    Returns:
+        float: The percentile value.
+    """
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarise(samples: List[int]) -> Dict[str, float]:
+    """
+    Summarises a list of timings in nanoseconds.
+
+    Args:
+        samples (list[int]): The timings of each measured run in nanoseconds.
+
+    Returns:
+        dict: The mean, minimum, maximum and p50/p95/p99 of the timings, in nanoseconds.
+    """
+    return {
+        "mean": sum(samples) / len(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+    }
+
+
+def benchmarkMaze(mazeFileName: str, backend: str, algorithms: List[str], runs: int, warmup: int,
+                  metrics: bool = False, verify: bool = False) -> List[dict]:
+    """
+    Benchmarks every requested algorithm on one maze with one graph backend.
+
+    The parse, graph build, search and backtrack phases are timed separately with perf_counter_ns. Each phase is run
+    `warmup` times without being recorded and then `runs` times. Solutions are never written to disk.
+
+    Args:
+        mazeFileName (str): The maze file to benchmark.
+        backend (str): The graph backend to build the maze with.
+        algorithms (list[str]): The algorithms to run.
+        runs (int): The number of measured runs.
+        warmup (int): The number of warm-up runs.
+        metrics (bool, optional): Whether to make one extra, instrumented, run of each algorithm and add its search
+          metrics to the record. The instrumented run is not included in the timings.
+        verify (bool, optional): Whether to check, before timing any search, that the graph built by the backend is
+          identical to the one built by the dict backend.
+
+    Returns:
+        list[dict]: One result record per algorithm.
+
+    Raises:
+        ValueError: If verify is set and the graph differs from the dict backend's.
+    """
+    parseTimes, buildTimes = [], []
+    for i in range(warmup + runs):
+        start = perf_counter_ns()
+        maze = readMaze(mazeFileName, backend)
+        parsed = perf_counter_ns()
+        adjacencyList = buildGraph(maze, backend)
+        built = perf_counter_ns()
+        if i >= warmup:
+            parseTimes.append(parsed - start)
+            buildTimes.append(built - parsed)
+        if i < warmup + runs - 1:
+            # Only the graph of the last run is searched, so release the others straight away rather than leaving
+            # their mapped files open, as batchRecords does
+            releaseGraph(maze, adjacencyList)
+
+    try:
+        if verify and not verifyGraph(adjacencyList, buildAdjacencyList(readMazeFile(mazeFileName))):
+            raise ValueError(f"The {backend} graph of {mazeFileName} differs from the dict backend's")
+
+        root, goal = findEndpoints(adjacencyList)
+        nodes = len(adjacencyList)
+
+        # Contract the graph up front for the algorithms that search the contracted graph, so the searches are timed
+        # on their own and the size of the graph before and after contraction can be reported
+        contraction = None
+        if any(algorithmType.endswith("-CONTRACTED") for algorithmType in algorithms):
+            start = perf_counter_ns()
+            contracted = getContractedGraph(adjacencyList)
+            contraction = {
+                "time": perf_counter_ns() - start,
+                "nodesBefore": nodes,
+                "nodesAfter": len(contracted),
+                "edgesAfter": contracted.edgeCount(),
+            }
+
+        # Likewise compute the landmark distance tables up front for the ALT search
+        landmarks = None
+        if "ASTAR-ALT" in algorithms:
+            start = perf_counter_ns()
+            table = getLandmarks(adjacencyList)
+            landmarks = {"time": perf_counter_ns() - start, "count": len(table)}
+
+        results = []
+        for algorithmType in algorithms:
+            solveFunc, searchRoot, searchGoal = selectSolver(adjacencyList, root, goal, algorithmType, maze)
+            searchTimes, backtrackTimes = [], []
+            for i in range(warmup + runs):
+                start = perf_counter_ns()
+                solutionMap, explored = solveFunc(adjacencyList, searchRoot, searchGoal)
+                searched = perf_counter_ns()
+                path = set()
+                if solutionMap is not None:
+                    path = buildPath(adjacencyList, solutionMap, searchRoot, searchGoal)
+                backtracked = perf_counter_ns()
+                if i >= warmup:
+                    searchTimes.append(searched - start)
+                    backtrackTimes.append(backtracked - searched)
+
+            search = summarise(searchTimes)
+            record = {
+                "maze": mazeFileName,
+                "backend": backend,
+                "algorithm": algorithmType,
+                "nodes": nodes,
+                "nodesExplored": explored,
+                "solutionLength": len(path),
+                "solved": solutionMap is not None,
+                "nodesExploredPerSecond": explored / (search["p50"] / 1e9) if search["p50"] else None,
+                "phases": {
+                    "parse": summarise(parseTimes),
+                    "build": summarise(buildTimes),
+                    "search": search,
+                    "backtrack": summarise(backtrackTimes),
+                },
+            }
+            if algorithmType.endswith("-CONTRACTED"):
+                record["contraction"] = contraction
+            if algorithmType == "ASTAR-ALT":
+                record["landmarks"] = landmarks
+            if metrics:
+                record["metrics"] = instrumentedRun(adjacencyList, solveFunc, searchRoot, searchGoal).asDict()
+            results.append(record)
+    finally:
+        # Release the contracted and packed graphs, landmark tables and tile abstractions kept on the graph straight
+        # away, rather than whenever the tile abstraction's reference back to the graph is collected, and close the
+        # mapped file of the mmap and cache backends
+        releaseGraph(maze, adjacencyList)
+    return results
+
+
+def releaseGraph(maze, adjacencyList) -> None:
+    """
+    Releases a maze read by readMaze and the graph built from it: the structures the solvers kept on the graph, and
+    the mapped file of the mmap and cache backends.
+    """
+    forgetDerived(adjacencyList)
+    if hasattr(maze, "close"):
+        maze.close()
+
+
+def instrumentedRun(adjacencyList, solveFunc, searchRoot, searchGoal) -> SearchMetrics:
+    """
+    Solves the maze once more with search metrics and memory tracing enabled.
+
+    Returns:
+        SearchMetrics: The metrics of the run. Only DFS and ASTAR count frontier operations, the other solvers just
+        have their search time and peak memory recorded.
+    """
+    metrics = SearchMetrics(traceMemory=True)
+    with metrics.phase("search"), metrics.memory():
+        if solveFunc in (aStarSolver, aStarSolverBucket, depthFirstSearch):
+            solutionMap, _ = solveFunc(adjacencyList, searchRoot, searchGoal, metrics)
+        else:
+            solutionMap, _ = solveFunc(adjacencyList, searchRoot, searchGoal)
+    if solutionMap is not None:
+        with metrics.phase("backtrack"):
+            buildPath(adjacencyList, solutionMap, searchRoot, searchGoal)
+    return metrics
+
+
+def runBenchmarks(mazeFiles: List[str], backends: List[str], algorithms: List[str], runs: int, warmup: int,
+                  metrics: bool = False, verify: bool = False) -> dict:
+    """
+    Benchmarks every combination of maze file, graph backend and algorithm.
+
+    Returns:
+        dict: A report holding the benchmark settings, details of the environment and the result records.
+    """
+    results = []
+    for mazeFileName in mazeFiles:
+        for backend in backends:
+            print(f"[*] Benchmarking {mazeFileName} ({backend})...", file=sys.stderr)
+            results.extend(benchmarkMaze(mazeFileName, backend, algorithms, runs, warmup, metrics, verify))
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "runs": runs,
+        "warmup": warmup,
+        "units": "ns",
+        "results": results,
+    }
+
+
+def parseArguments(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the maze solvers without any prompts.")
+    parser.add_argument("mazes", nargs="*", help="maze files to benchmark (default: every maze file in the current directory)")
+    parser.add_argument("-a", "--algorithms", nargs="+", default=list(ALGORITHMS), choices=ALGORITHMS)
+    parser.add_argument("-b", "--backends", nargs="+", default=["dict"], choices=BACKENDS)
+    parser.add_argument("-r", "--runs", type=int, default=10, help="number of measured runs (default: 10)")
+    parser.add_argument("-w", "--warmup", type=int, default=2, help="number of warm-up runs (default: 2)")
+    parser.add_argument("-m", "--metrics", action="store_true", help="add search metrics from one extra instrumented run to each record")
+    parser.add_argument("--verify", action="store_true", help="check every graph against the dict backend before timing it")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="JSON report to write, - for stdout (default: benchmark.json)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parseArguments()
+    if args.runs < 1:
+        sys.exit("benchmark.py: error: --runs must be at least 1")
+
+    report = runBenchmarks(args.mazes or sorted(findMazeFiles()), args.backends, args.algorithms, args.runs, args.warmup,
+                           args.metrics, args.verify)
+
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+    else:
+        directory = os.path.dirname(args.output)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"[*] Report written to {args.output}", file=sys.stderr)
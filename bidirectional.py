@@ -0,0 +1,172 @@
+from heapq import heappush, heappop
+from typing import Dict, List, Tuple
+
+from astar import cellDistance
+
+
+def joinSearches(forwardParents: Dict[Tuple, Tuple], backwardParents: Dict[Tuple, Tuple], root: Tuple, goal: Tuple,
+                 meet: Tuple) -> Dict[Tuple, Tuple]:
+    """
+    Joins the search trees of a forward and a backward search at the node where they met.
+
+    Args:
+        forwardParents (dict): Maps each node reached from the root to its parent towards the root.
+        backwardParents (dict): Maps each node reached from the goal to its parent towards the goal.
+        root (tuple): The root node.
+        goal (tuple): The goal node.
+        meet (tuple): A node reached by both searches.
+
+    Returns:
+        dict: A map from each node on the path to the node before it, which backtrackSolution can follow from the
+        goal back to the root.
+    """
+    cameFrom = {root: None}
+
+    # Follow the forward tree from the meeting node back to the root
+    node = meet
+    while node != root:
+        cameFrom[node] = forwardParents[node]
+        node = forwardParents[node]
+
+    # Follow the backward tree from the meeting node on to the goal, reversing its links
+    node = meet
+    while node != goal:
+        cameFrom[backwardParents[node]] = node
+        node = backwardParents[node]
+
+    return cameFrom
+
+
+def bidirectionalBFS(adjacencyList: Dict[Tuple, List[Tuple]], root: Tuple, goal: Tuple) -> Tuple[Dict[Tuple, Tuple], int]:
+    """
+    Breadth first search grown from the root and the goal at the same time, always expanding a whole layer of the
+    smaller frontier. The search stops at the end of the first layer in which the frontiers touch, taking the shortest
+    of the connections found in that layer, so the path returned is a shortest path.
+
+    The maze graph is undirected, so the neighbours of a node are also the nodes that lead to it.
+
+    Args:
+        adjacencyList (dictionary of list): a dictionary that maps each node in the graph to a list of its adjacent nodes.
+        root (tuple): the node to start the search from.
+        goal (tuple): the node to search for.
+
+    Returns:
+        If the goal node is found, returns a tuple containing a dictionary that maps each node on the path to its parent, and the number of nodes explored during the traversal.
+        If the goal node is not found, returns a tuple containing None for the path dictionary, and the number of nodes explored during the traversal.
+    """
+    if root == goal:
+        return {root: None}, 1
+
+    # Distances and parents for each side of the search
+    forwardDistance, backwardDistance = {root: 0}, {goal: 0}
+    forwardParents, backwardParents = {root: None}, {goal: None}
+    forwardFrontier, backwardFrontier = [root], [goal]
+
+    nodesExplored = 0
+
+    while forwardFrontier and backwardFrontier:
+        # Expand the smaller frontier
+        if len(forwardFrontier) <= len(backwardFrontier):
+            frontier, distance, parents, otherDistance = forwardFrontier, forwardDistance, forwardParents, backwardDistance
+        else:
+            frontier, distance, parents, otherDistance = backwardFrontier, backwardDistance, backwardParents, forwardDistance
+
+        best, meet = float('inf'), None
+        nextFrontier = []
+        for current in frontier:
+            nodesExplored += 1
+            for neighbor in adjacencyList[current]:
+                if neighbor not in distance:
+                    distance[neighbor] = distance[current] + 1
+                    parents[neighbor] = current
+                    nextFrontier.append(neighbor)
+                # Record a connection between the two searches
+                if neighbor in otherDistance and distance[neighbor] + otherDistance[neighbor] < best:
+                    best = distance[neighbor] + otherDistance[neighbor]
+                    meet = neighbor
+
+        if meet is not None:
+            return joinSearches(forwardParents, backwardParents, root, goal, meet), nodesExplored
+
+        if distance is forwardDistance:
+            forwardFrontier = nextFrontier
+        else:
+            backwardFrontier = nextFrontier
+
+    # If the frontiers never met there is no path from the root to the goal
+    return None, nodesExplored
+
+
+def bidirectionalAStar(adjacencyList: Dict[Tuple, List[Tuple]], root: Tuple, goal: Tuple) -> Tuple[Dict[Tuple, Tuple], int]:
+    """
+    A* grown from the root towards the goal and from the goal towards the root at the same time.
+
+    Both sides share the averaged potential p(v) = (cellDistance(v, goal) - cellDistance(v, root)) / 2, the forward
+    side ordering its queue by distance + p(v) and the backward side by distance - p(v). Because the two priorities of
+    any node add up to the length of the best path through it, the search can stop as soon as the two lowest
+    priorities add up to at least the best connection found, and the path returned is a shortest path. The side with
+    the lower priority is expanded next.
+
+    The maze graph is undirected, so the neighbours of a node are also the nodes that lead to it.
+
+    Args:
+        adjacencyList (dictionary of list): a dictionary that maps each node in the graph to a list of its adjacent nodes.
+        root (tuple): the node to start the search from.
+        goal (tuple): the node to search for.
+
+    Returns:
+        If the goal node is found, returns a tuple containing a dictionary that maps each node on the path to its parent, and the number of nodes explored during the traversal.
+        If the goal node is not found, returns a tuple containing None for the path dictionary, and the number of nodes explored during the traversal.
+    """
+    if root == goal:
+        return {root: None}, 1
+
+    def potential(node: Tuple) -> float:
+        return (cellDistance(node, goal) - cellDistance(node, root)) / 2
+
+    # Distances, parents and priority queues for each side of the search
+    forwardDistance, backwardDistance = {root: 0}, {goal: 0}
+    forwardParents, backwardParents = {root: None}, {goal: None}
+    forwardQueue = [(potential(root), root)]
+    backwardQueue = [(-potential(goal), goal)]
+
+    # Length of the best path found so far and the node where the two searches meet on it
+    best, meet = float('inf'), None
+
+    nodesExplored = 0
+
+    while forwardQueue and backwardQueue:
+        # Stop once no unexplored connection can be shorter than the best path found
+        if forwardQueue[0][0] + backwardQueue[0][0] >= best:
+            break
+
+        # Expand the side with the lower priority, the backward side sees the potential negated
+        if forwardQueue[0][0] <= backwardQueue[0][0]:
+            queue, distance, parents, otherDistance, sign = forwardQueue, forwardDistance, forwardParents, backwardDistance, 1
+        else:
+            queue, distance, parents, otherDistance, sign = backwardQueue, backwardDistance, backwardParents, forwardDistance, -1
+
+        priority, current = heappop(queue)
+        nodesExplored += 1
+
+        # Skip entries made stale by a later, shorter distance
+        if priority > distance[current] + sign * potential(current):
+            continue
+
+        for neighbor in adjacencyList[current]:
+            tentative_distance = distance[current] + 1
+            if tentative_distance < distance.get(neighbor, float('inf')):
+                distance[neighbor] = tentative_distance
+                parents[neighbor] = current
+                heappush(queue, (tentative_distance + sign * potential(neighbor), neighbor))
+
+                # Record a better connection between the two searches
+                if neighbor in otherDistance and tentative_distance + otherDistance[neighbor] < best:
+                    best = tentative_distance + otherDistance[neighbor]
+                    meet = neighbor
+
+    if meet is None:
+        # If the searches never met there is no path from the root to the goal
+        return None, nodesExplored
+
+    return joinSearches(forwardParents, backwardParents, root, goal, meet), nodesExplored
@@ -0,0 +1,141 @@
+from typing import Dict, Optional, Tuple
+
+from adjacency import getDerived
+
+# Maps every byte of a maze row to the binary digit of its cell: '1' for an open cell, '0' for anything else
+_DIGITS = bytes(ord("1") if byte == ord("-") else ord("0") for byte in range(256))
+
+
+class PackedMaze:
+    """
+    The open cells of a maze packed into a single integer bitset, one bit per cell.
+
+    Cell (x, y) is bit y * stride + x // 2. Each row holds one bit per cell followed by an always clear padding bit,
+    so shifting the bitset by one moves every cell to its horizontal neighbour and shifting it by the stride moves
+    every cell to its vertical neighbour, without any cell wrapping round onto the next row.
+    """
+
+    def __init__(self, bits: int, stride: int, height: int):
+        self.bits = bits
+        self.stride = stride
+        self.height = height
+
+    def bit(self, node: Tuple[int, int]) -> int:
+        """
+        Returns the index of the bit of a cell.
+        """
+        x, y = node
+        return y * self.stride + x // 2
+
+    def cell(self, bit: int) -> Tuple[int, int]:
+        """
+        Returns the (x, y) coordinate of the cell of a bit.
+        """
+        y, column = divmod(bit, self.stride)
+        return column * 2, y
+
+
+def packMaze(maze) -> PackedMaze:
+    """
+    Packs the open cells of a maze into a PackedMaze.
+
+    Args:
+        maze: The list of strings returned by readMazeFile, a LazyMazeGraph, or any graph with width and height
+          attributes and an isOpen(x, y) method such as CSRGraph.
+
+    Returns:
+        PackedMaze: The packed maze.
+    """
+    if isinstance(maze, list):
+        height = len(maze)
+        rows = [row.encode("latin-1") for row in maze]
+    elif hasattr(maze, "row"):
+        # LazyMazeGraph, whose rows are already bytes
+        height = maze.height
+        rows = [maze.row(y) for y in range(height)]
+    else:
+        height = maze.height
+        rows = [bytes(ord("-") if maze.isOpen(x, y) else ord("#") for x in range(maze.width)) for y in range(height)]
+
+    columns = (max((len(row) for row in rows), default=0) + 1) // 2
+    stride = columns + 1
+
+    # Each row becomes the binary digits of its cells, lowest bit first, then the rows are joined into one integer
+    bits = 0
+    for y in range(height - 1, -1, -1):
+        cells = rows[y][::2].translate(_DIGITS)[::-1]
+        bits = (bits << stride) | (int(cells, 2) if cells else 0)
+    return PackedMaze(bits, stride, height)
+
+
+def getPackedMaze(maze, graph=None) -> PackedMaze:
+    """
+    Returns the packed form of a maze, packing it on the first call and reusing it afterwards. The packed maze is kept
+    on the graph built from the maze, under the name "packed", or on the maze itself when it is a graph.
+    """
+    return getDerived(graph if graph is not None else maze, "packed", lambda _: packMaze(maze))
+
+
+def bitParallelBFS(maze, root: Tuple[int, int], goal: Tuple[int, int], graph=None) -> Tuple[Optional[Dict], int]:
+    """
+    Breadth first search which expands the whole frontier at once with bitwise operations on the packed maze.
+
+    Every layer of the search is a bitset: shifting it by one bit and by a row in both directions and masking the
+    result with the cells not yet visited gives the next layer. Each layer is also OR-ed into one of three layer
+    class bitsets, by its distance modulo 3. Neighbouring cells are at most one layer apart, so walking back from
+    the goal, the neighbour in the class of the previous layer is always one step closer to the root. This recovers
+    a shortest path with three extra bits per cell instead of a parent for every node.
+
+    Args:
+        maze: The maze as accepted by packMaze.
+        root (tuple): The node to start the search from.
+        goal (tuple): The node to search for.
+        graph (optional): The graph built from the maze, which keeps the packed maze between searches.
+
+    Returns:
+        If the goal node is found, returns a tuple containing a dictionary that maps each node on a shortest path to
+        its parent, and the number of nodes explored during the traversal.
+        If the goal node is not found, returns a tuple containing None for the path dictionary, and the number of
+        nodes explored during the traversal.
+    """
+    packed = getPackedMaze(maze, graph)
+    stride = packed.stride
+    rootBit = 1 << packed.bit(root)
+    goalBit = 1 << packed.bit(goal)
+
+    if not packed.bits & rootBit:
+        return None, 0
+
+    # Cells not yet reached, the current layer, and the cells reached at distances 0, 1 and 2 modulo 3
+    unvisited = packed.bits ^ rootBit
+    frontier = rootBit
+    classes = [rootBit, 0, 0]
+    distance = 0
+
+    while not frontier & goalBit:
+        # Move every cell of the layer one step in each direction and keep the open cells not reached yet
+        frontier = ((frontier << 1) | (frontier >> 1) | (frontier << stride) | (frontier >> stride)) & unvisited
+        if not frontier:
+            return None, (packed.bits ^ unvisited).bit_count()
+        unvisited ^= frontier
+        distance += 1
+        classes[distance % 3] |= frontier
+
+    nodesExplored = (packed.bits ^ unvisited).bit_count()
+
+    # Unpack the layer classes into bytes once, so single bits can be tested without shifting the whole bitset
+    size = (packed.bits.bit_length() + 7) // 8
+    layers = [layer.to_bytes(size, "little") for layer in classes]
+
+    # Walk back from the goal, stepping to a neighbour in the previous layer each time
+    cameFrom = {root: None}
+    current = packed.bit(goal)
+    for step in range(distance, 0, -1):
+        previous = layers[(step - 1) % 3]
+        for neighbour in (current - stride, current + stride, current + 1, current - 1):
+            if 0 <= neighbour < size * 8 and previous[neighbour >> 3] >> (neighbour & 7) & 1:
+                break
+        cameFrom[packed.cell(current)] = packed.cell(neighbour)
+        current = neighbour
+
+    return cameFrom, nodesExplored
@@ -0,0 +1,217 @@
+from array import array
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from csrgraph import CSRGraph, labelCSRGraph
+
+
+class ComponentIndex:
+    """
+    The connected component of every node of a maze, so whether two cells are connected is answered in O(1).
+
+    Labels are held in a flat array, indexed by node id when a cellIndex is given (for CSRGraphs) and by cell slot
+    (y * columns + x // 2) otherwise, with -1 for cells which are walls.
+
+    The index of an adjacency list is kept up to date as cells are opened and closed (see cellsChanged). Components
+    merged by opening a cell keep their labels, and merged records which label each one now goes by. The labels
+    given are expected to run from 0 to count - 1, as the flood fills number them, so new labels start at count.
+    """
+
+    def __init__(self, labels: array, count: int, width: int, height: int, cellIndex: array = None):
+        self.labels = labels
+        self.count = count
+        self.width = width
+        self.height = height
+        self.cellIndex = cellIndex
+        # Number of cell slots per row (cells sit on every other column)
+        self.columns = (width + 1) // 2
+        # Labels of merged components mapped to the label they were merged into, and the next unused label
+        self.merged: Dict[int, int] = {}
+        self.nextLabel = count
+
+    def component(self, node: Tuple[int, int]) -> int:
+        """
+        Returns the label of the component a cell belongs to, or -1 if the cell is not a node of the maze.
+        """
+        x, y = node
+        if x % 2 or not (0 <= x < self.width and 0 <= y < self.height):
+            return -1
+        i = y * self.columns + x // 2
+        if self.cellIndex is not None:
+            i = self.cellIndex[i]
+            if i == -1:
+                return -1
+        label = self.labels[i]
+        if self.merged and label != -1:
+            label = self.find(label)
+        return label
+
+    def find(self, label: int) -> int:
+        """
+        Returns the label a component goes by after any merges.
+        """
+        root = label
+        while root in self.merged:
+            root = self.merged[root]
+        # Point every label on the way straight at the root, so later lookups take one step
+        while label != root:
+            self.merged[label], label = root, self.merged[label]
+        return root
+
+    def connected(self, a: Tuple[int, int], b: Tuple[int, int]) -> bool:
+        """
+        Returns whether there is a path between two cells.
+        """
+        component = self.component(a)
+        return component != -1 and component == self.component(b)
+
+    def cellsChanged(self, adjacencyList, changed: List[Tuple[int, int]]) -> None:
+        """
+        Brings the labels of an adjacency list up to date after incremental.setCell opened or closed a cell, given
+        the cells it returned (the changed cell first, then its open neighbours).
+
+        Opening a cell can only merge components: the cell takes the label of one of the components next to it and
+        the others are recorded as merged into it, without relabelling any cell. Closing a cell can split its
+        component. A breadth first search is run from every open neighbour in turn, one node each, and searches
+        which meet are connected. A group of searches that runs out of nodes before meeting the rest has found a
+        separate component, and only its cells are relabelled, so the work done is proportional to the smaller
+        parts of the split rather than to the maze.
+        """
+        if not changed:
+            return
+        cell = changed[0]
+        x, y = cell
+        slot = y * self.columns + x // 2
+
+        if cell in adjacencyList:
+            # Opened: join the components next to the cell
+            roots = sorted({self.component(neighbour) for neighbour in adjacencyList[cell]})
+            if roots:
+                label = roots[0]
+                for root in roots[1:]:
+                    self.merged[root] = label
+                self.count -= len(roots) - 1
+            else:
+                label = self.nextLabel
+                self.nextLabel += 1
+                self.count += 1
+            self.labels[slot] = label
+            return
+
+        # Closed: the cell leaves its component, which may fall apart into the parts around its open neighbours
+        self.labels[slot] = -1
+        starts = changed[1:]
+        if not starts:
+            self.count -= 1
+            return
+
+        owner = {start: i for i, start in enumerate(starts)}
+        queues = [deque([start]) for start in starts]
+        # The searches which have met, as a union-find over search numbers
+        group = list(range(len(starts)))
+        groups = len(starts)
+
+        def groupOf(i: int) -> int:
+            while group[i] != i:
+                i = group[i]
+            return i
+
+        while groups > 1:
+            for i, queue in enumerate(queues):
+                if not queue:
+                    continue
+                for neighbour in adjacencyList[queue.popleft()]:
+                    j = owner.get(neighbour)
+                    if j is None:
+                        owner[neighbour] = i
+                        queue.append(neighbour)
+                    elif groupOf(j) != groupOf(i):
+                        # Two searches met, so their parts are still connected
+                        group[groupOf(j)] = groupOf(i)
+                        groups -= 1
+                if queue or groups == 1:
+                    continue
+
+                # Once every search of a group has run out of nodes without meeting the others, the group has found a
+                # component of its own. It never meets another search again, so it is simply left with empty queues.
+                root = groupOf(i)
+                members = {k for k in range(len(queues)) if groupOf(k) == root}
+                if any(queues[k] for k in members):
+                    continue
+                label = self.nextLabel
+                self.nextLabel += 1
+                for (nx, ny), k in owner.items():
+                    if k in members:
+                        self.labels[ny * self.columns + nx // 2] = label
+                groups -= 1
+                self.count += 1
+                if groups == 1:
+                    break
+
+
+def buildComponentIndex(adjacencyList, width: int = None, height: int = None) -> ComponentIndex:
+    """
+    Labels the connected components of a maze graph by flood fill.
+
+    CSRGraphs are labelled by node id over their arrays. Any other graph is flood filled through its adjacency list
+    interface into an array of cell slots, so no per-node objects are kept.
+
+    Args:
+        adjacencyList: The graph of the maze.
+        width (int, optional): The width of the maze in characters, found from the graph if not given.
+        height (int, optional): The height of the maze in rows, found from the graph if not given.
+
+    Returns:
+        ComponentIndex: The component index of the graph.
+    """
+    if isinstance(adjacencyList, CSRGraph):
+        labels, count = labelCSRGraph(adjacencyList)
+        return ComponentIndex(labels, count, adjacencyList.width, adjacencyList.height, adjacencyList.cellIndex)
+
+    if width is None or height is None:
+        width, height = getattr(adjacencyList, "width", None), getattr(adjacencyList, "height", None)
+        if width is None or height is None:
+            width = max((x for x, _ in adjacencyList), default=-1) + 1
+            height = max((y for _, y in adjacencyList), default=-1) + 1
+    columns = (width + 1) // 2
+
+    labels = array("i", [-1]) * (height * columns)
+    count = 0
+    for x, y in adjacencyList:
+        if labels[y * columns + x // 2] != -1:
+            continue
+        labels[y * columns + x // 2] = count
+        stack = [(x, y)]
+        while stack:
+            for nx, ny in adjacencyList[stack.pop()]:
+                if labels[ny * columns + nx // 2] == -1:
+                    labels[ny * columns + nx // 2] = count
+                    stack.append((nx, ny))
+        count += 1
+    return ComponentIndex(labels, count, width, height)
+
+
+def getComponentIndex(adjacencyList) -> Optional[ComponentIndex]:
+    """
+    Returns the component index of a maze graph, or None if the graph cannot hold one.
+
+    The components are labelled on first use rather than by the graph builders, so building a graph never pays for
+    them, and the index is kept on the graph (AdjacencyList and CSRGraph both have a components attribute) for every
+    later query. A graph loaded from the graph cache comes with the labels stored in the file. A LazyMazeGraph has
+    no index, since labelling it would read the whole mapped file, and neither does a plain dict.
+    """
+    if not hasattr(adjacencyList, "components"):
+        return None
+    if adjacencyList.components is None:
+        adjacencyList.components = buildComponentIndex(adjacencyList)
+    return adjacencyList.components
+
+
+def mayBeConnected(adjacencyList, a: Tuple[int, int], b: Tuple[int, int]) -> bool:
+    """
+    Returns False if the component index of a maze graph shows there is no path between two cells, in O(1) once the
+    index has been built (see getComponentIndex). Graphs without an index always return True, leaving the answer to
+    the search.
+    """
+    components = getComponentIndex(adjacencyList)
+    return components is None or components.connected(a, b)
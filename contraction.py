@@ -0,0 +1,397 @@
+import os
+import struct
+import sys
+from array import array
+from collections import ChainMap
+from heapq import heappush, heappop
+from typing import Dict, List, Optional, Tuple
+
+from adjacency import getDerived, setDerived
+from astar import cellDistance
+from graphcache import CACHE_DIRECTORY, fileDigest
+
+# A weighted edge: the node at the other end, the number of steps along the corridor and the first cell after the
+# starting node, which is enough to walk the corridor again when the path is expanded
+Edge = Tuple[Tuple[int, int], int, Tuple[int, int]]
+
+# Identifies a contracted graph cache file and the version of its layout
+MAGIC = b"MAZECTRG"
+VERSION = 1
+
+# Header: magic, version, little endian flag, number of kept nodes, number of edges, number of nodes before contraction
+HEADER = struct.Struct("<8sIB3xIII")
+
+# Order in which the arrays of a contracted graph follow the header: the coordinates of every kept node, the offsets
+# of its edges, then the end node, weight and first step of every edge
+FIELDS = ("xs", "ys", "offsets", "endXs", "endYs", "weights", "stepXs", "stepYs")
+
+
+class ContractedGraph:
+    """
+    A maze graph with every corridor of degree-2 cells collapsed into a single weighted edge.
+
+    Only junctions and dead ends (nodes that do not have exactly two neighbours) are kept. Each kept node maps to a
+    list of (neighbour, weight, first step) edges, keeping the shortest edge when two corridors join the same pair of
+    nodes. The cells inside a corridor are not stored; they are recovered by walking the original graph.
+    """
+
+    def __init__(self, edges: Dict[Tuple[int, int], List[Edge]], originalNodes: int):
+        self.edges = edges
+        self.originalNodes = originalNodes
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+    def __contains__(self, node: Tuple[int, int]) -> bool:
+        return node in self.edges
+
+    def __getitem__(self, node: Tuple[int, int]) -> List[Edge]:
+        return self.edges.get(node, [])
+
+    def edgeCount(self) -> int:
+        """
+        Returns the number of undirected edges in the contracted graph.
+        """
+        return sum(len(edges) for edges in self.edges.values()) // 2
+
+
+def walkCorridor(adjacencyList, start: Tuple[int, int], firstStep: Tuple[int, int], stop) -> Tuple[Tuple[int, int], int, Tuple[int, int]]:
+    """
+    Follows a corridor from start through firstStep until reaching a node for which stop(node) is true, or a node
+    that does not have exactly two neighbours.
+
+    Args:
+        adjacencyList: The original graph of the maze.
+        start (tuple): The node the corridor starts from.
+        firstStep (tuple): The first cell of the corridor after start.
+        stop (callable): Returns True for nodes the walk should end on even if they have two neighbours.
+
+    Returns:
+        Tuple: The node the corridor ends on, the number of steps taken and the last cell before that node.
+    """
+    previous, current, steps = start, firstStep, 1
+    while not stop(current) and current != start:
+        neighbours = adjacencyList[current]
+        if len(neighbours) != 2:
+            break
+        previous, current = current, neighbours[0] if neighbours[1] == previous else neighbours[1]
+        steps += 1
+    return current, steps, previous
+
+
+def contractGraph(adjacencyList) -> ContractedGraph:
+    """
+    Collapses every chain of degree-2 cells of a maze graph into a weighted edge between the junctions or dead ends
+    at either end of it.
+
+    Args:
+        adjacencyList: The graph of the maze, as returned by buildGraph.
+
+    Returns:
+        ContractedGraph: The contracted graph.
+    """
+    def isKept(node: Tuple[int, int]) -> bool:
+        return len(adjacencyList[node]) != 2
+
+    edges = {}
+    for node in adjacencyList.keys():
+        if not isKept(node):
+            continue
+
+        # Walk each corridor leaving the node, keeping the shortest edge to every other kept node
+        shortest = {}
+        for firstStep in adjacencyList[node]:
+            end, weight, _ = walkCorridor(adjacencyList, node, firstStep, isKept)
+            if end != node and (end not in shortest or weight < shortest[end][1]):
+                shortest[end] = (end, weight, firstStep)
+        edges[node] = list(shortest.values())
+
+    return ContractedGraph(edges, len(adjacencyList))
+
+
+def getContractedGraph(adjacencyList) -> ContractedGraph:
+    """
+    Returns the contracted graph of a maze graph, contracting it on the first call and reusing it afterwards. The
+    contracted graph is kept on the graph itself, under the name "contracted".
+
+    Args:
+        adjacencyList: The graph of the maze.
+
+    Returns:
+        ContractedGraph: The contracted graph.
+    """
+    return getDerived(adjacencyList, "contracted", contractGraph)
+
+
+def cacheFileName(mazeFileName: str) -> str:
+    """
+    Returns the name of the file the contracted graph of a maze file is cached in. The name includes a hash of the
+    contents of the maze, so a changed maze never loads a stale graph.
+    """
+    digest = fileDigest(mazeFileName).hex()[:16]
+    return f"{CACHE_DIRECTORY}{os.path.basename(mazeFileName).split('.')[0]}-{digest}.contracted"
+
+
+def writeContractedGraph(fileName: str, contracted: ContractedGraph) -> None:
+    """
+    Writes a contracted graph as a header followed by flat arrays: the kept nodes and the offsets of their edges, as
+    in a CSRGraph, and one array per field of the edges.
+    """
+    directory = os.path.dirname(fileName)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    arrays = {field: array("i") for field in FIELDS}
+    arrays["offsets"].append(0)
+    for (x, y), edges in contracted.edges.items():
+        arrays["xs"].append(x)
+        arrays["ys"].append(y)
+        for (endX, endY), weight, (stepX, stepY) in edges:
+            arrays["endXs"].append(endX)
+            arrays["endYs"].append(endY)
+            arrays["weights"].append(weight)
+            arrays["stepXs"].append(stepX)
+            arrays["stepYs"].append(stepY)
+        arrays["offsets"].append(len(arrays["endXs"]))
+
+    temporary = f"{fileName}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, sys.byteorder == "little", len(contracted), len(arrays["endXs"]),
+                            contracted.originalNodes))
+        for field in FIELDS:
+            arrays[field].tofile(f)
+    os.replace(temporary, fileName)
+
+
+def readContractedGraph(fileName: str) -> Optional[ContractedGraph]:
+    """
+    Reads a contracted graph written by writeContractedGraph, or returns None if the file is missing or was written
+    by another version or on a machine with a different byte order.
+    """
+    if not os.path.exists(fileName):
+        return None
+
+    with open(fileName, "rb") as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return None
+        magic, version, littleEndian, nodes, edgeCount, originalNodes = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION or littleEndian != (sys.byteorder == "little"):
+            return None
+
+        arrays = []
+        try:
+            for length in (nodes, nodes, nodes + 1) + (edgeCount,) * 5:
+                values = array("i")
+                values.fromfile(f, length)
+                arrays.append(values)
+        except EOFError:
+            return None
+
+    xs, ys, offsets, endXs, endYs, weights, stepXs, stepYs = arrays
+
+    # Rebuild the edge lists of every kept node from its slice of the edge arrays
+    ends = list(zip(endXs, endYs))
+    steps = list(zip(stepXs, stepYs))
+    edges = {}
+    for i, node in enumerate(zip(xs, ys)):
+        edges[node] = [(ends[k], weights[k], steps[k]) for k in range(offsets[i], offsets[i + 1])]
+    return ContractedGraph(edges, originalNodes)
+
+
+def loadContractedGraph(mazeFileName: str, adjacencyList) -> ContractedGraph:
+    """
+    Loads the contracted graph of a maze file from the cache, contracting the graph and caching the result if there is
+    no cached copy yet. The contracted graph is also kept on the graph for getContractedGraph.
+
+    Args:
+        mazeFileName (str): The name of the maze file.
+        adjacencyList: The graph built from the maze file.
+
+    Returns:
+        ContractedGraph: The contracted graph.
+    """
+    fileName = cacheFileName(mazeFileName)
+    contracted = readContractedGraph(fileName)
+    if contracted is None:
+        contracted = contractGraph(adjacencyList)
+        writeContractedGraph(fileName, contracted)
+
+    setDerived(adjacencyList, "contracted", contracted)
+    return contracted
+
+
+def attachEndpoints(contracted: ContractedGraph, adjacencyList, root: Tuple[int, int], goal: Tuple[int, int]) -> ChainMap:
+    """
+    Returns a view of the contracted graph in which the root and goal are also nodes. A root or goal in the middle of
+    a corridor is joined to the nodes at both ends of its corridor (or directly to the other endpoint if they share a
+    corridor), replacing the edge that ran through it; the contracted graph itself is left unchanged.
+
+    Args:
+        contracted (ContractedGraph): The contracted graph.
+        adjacencyList: The original graph of the maze.
+        root (tuple): The starting node.
+        goal (tuple): The goal node.
+
+    Returns:
+        ChainMap: A mapping from each node to its list of edges.
+    """
+    def isStop(node: Tuple[int, int]) -> bool:
+        return node in contracted or node == root or node == goal
+
+    overlay = {}
+
+    def addEdge(node: Tuple[int, int], edge: Edge, corridorStep: Tuple[int, int] = None) -> None:
+        if node not in overlay:
+            overlay[node] = list(contracted[node])
+        # Replace the edge along the corridor that has just been split by the endpoint
+        overlay[node] = [e for e in overlay[node] if e[2] != corridorStep] + [edge]
+
+    for endpoint in {root, goal}:
+        if endpoint in contracted:
+            continue
+        overlay.setdefault(endpoint, [])
+        for firstStep in adjacencyList[endpoint]:
+            end, weight, lastStep = walkCorridor(adjacencyList, endpoint, firstStep, isStop)
+            if end != endpoint:
+                addEdge(endpoint, (end, weight, firstStep))
+                addEdge(end, (endpoint, weight, lastStep), lastStep)
+
+    return ChainMap(overlay, contracted.edges)
+
+
+def expandPath(adjacencyList, edges: ChainMap, junctionMap: Dict, root: Tuple[int, int], goal: Tuple[int, int]) -> Dict:
+    """
+    Expands a map of parents in the contracted graph into a map of parents over every cell of the maze, walking the
+    corridor behind each edge on the path.
+
+    Args:
+        adjacencyList: The original graph of the maze.
+        edges (ChainMap): The edges the search used, as returned by attachEndpoints.
+        junctionMap (dict): Maps each node of the contracted graph on the path to its parent.
+        root (tuple): The starting node.
+        goal (tuple): The goal node.
+
+    Returns:
+        dict: A map from each cell on the path to the cell before it, which backtrackSolution can follow.
+    """
+    cameFrom = {root: None}
+    node = goal
+    while node != root:
+        parent = junctionMap[node]
+        # The search follows the lightest edge between two nodes
+        _, weight, firstStep = min((edge for edge in edges[parent] if edge[0] == node), key=lambda edge: edge[1])
+
+        previous, current = parent, firstStep
+        while current != node:
+            cameFrom[current] = previous
+            neighbours = adjacencyList[current]
+            previous, current = current, neighbours[0] if neighbours[1] == previous else neighbours[1]
+        cameFrom[node] = previous
+        node = parent
+
+    return cameFrom
+
+
+def aStarSolverWeighted(edges: ChainMap, root: Tuple[int, int], goal: Tuple[int, int]) -> Tuple[Dict, int]:
+    """
+    A* over a weighted contracted graph, using the Manhattan distance in cell steps as the heuristic so the path found
+    is a shortest path.
+
+    Args:
+        edges (ChainMap): Maps each node to its list of (neighbour, weight, first step) edges.
+        root (tuple): the node to start the search from.
+        goal (tuple): the node to search for.
+
+    Returns:
+        If the goal node is found, returns a tuple containing a dictionary that maps each visited node to its parent in the search tree, and the number of nodes explored during the traversal.
+        If the goal node is not found, returns a tuple containing None for the path dictionary, and the number of nodes explored during the traversal.
+    """
+    distance = {root: 0}
+    cameFrom = {root: None}
+    prioQueue = [(cellDistance(root, goal), root)]
+    nodesExplored = 0
+
+    while prioQueue:
+        priority, current = heappop(prioQueue)
+        nodesExplored += 1
+
+        if current == goal:
+            return cameFrom, nodesExplored
+
+        # Skip entries made stale by a later, shorter distance
+        if priority > distance[current] + cellDistance(current, goal):
+            continue
+
+        for neighbor, weight, _ in edges.get(current, ()):
+            tentative_distance = distance[current] + weight
+            if tentative_distance < distance.get(neighbor, float('inf')):
+                distance[neighbor] = tentative_distance
+                cameFrom[neighbor] = current
+                heappush(prioQueue, (tentative_distance + cellDistance(neighbor, goal), neighbor))
+
+    return None, nodesExplored
+
+
+def depthFirstSearchWeighted(edges: ChainMap, root: Tuple[int, int], goal: Tuple[int, int]) -> Tuple[Dict, int]:
+    """
+    Depth first search over a weighted contracted graph, following edges in the same way as depthFirstSearch.
+
+    Args:
+        edges (ChainMap): Maps each node to its list of (neighbour, weight, first step) edges.
+        root (tuple): the node to start the search from.
+        goal (tuple): the node to search for.
+
+    Returns:
+        If the goal node is found, returns a tuple containing a dictionary that maps each visited node to its parent in the search tree, and the number of nodes explored during the traversal.
+        If the goal node is not found, returns a tuple containing None for the path dictionary, and the number of nodes explored during the traversal.
+    """
+    discovered = set()
+    S = [root]
+    cameFrom = {}
+    nodesExplored = 0
+
+    while S:
+        v = S.pop()
+        nodesExplored += 1
+
+        if v == goal:
+            return cameFrom, nodesExplored
+
+        if v not in discovered:
+            discovered.add(v)
+            for w, _, _ in edges.get(v, ()):
+                if w in discovered:
+                    continue
+                S.append(w)
+                cameFrom[w] = v
+
+    return None, nodesExplored
+
+
+def contractedSolver(weightedSolver):
+    """
+    Wraps a weighted solver so it takes and returns the same things as aStarSolver and depthFirstSearch. The graph is
+    contracted (or the cached contraction reused), the root and goal are attached, the weighted solver is run and the
+    path it finds is expanded back into every cell.
+
+    Args:
+        weightedSolver (callable): aStarSolverWeighted or depthFirstSearchWeighted.
+
+    Returns:
+        callable: A solver taking (adjacencyList, root, goal) and returning (cameFrom, nodesExplored).
+    """
+    def solve(adjacencyList, root: Tuple[int, int], goal: Tuple[int, int]) -> Tuple[Dict, int]:
+        edges = attachEndpoints(getContractedGraph(adjacencyList), adjacencyList, root, goal)
+        junctionMap, nodesExplored = weightedSolver(edges, root, goal)
+        if junctionMap is None:
+            return None, nodesExplored
+        return expandPath(adjacencyList, edges, junctionMap, root, goal), nodesExplored
+
+    solve.__name__ = f"contracted_{weightedSolver.__name__}"
+    solve.__doc__ = f"Runs {weightedSolver.__name__} on the contracted graph and expands the path it finds."
+    return solve
+
+
+contractedAStarSolver = contractedSolver(aStarSolverWeighted)
+contractedDepthFirstSearch = contractedSolver(depthFirstSearchWeighted)
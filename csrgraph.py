@@ -0,0 +1,230 @@
+from array import array
+from collections import defaultdict
+from typing import Iterator, List, Tuple
+
+
+class CSRGraph:
+    """
+    A compact, integer-indexed representation of a maze graph.
+
+    Every open cell is numbered in row-major order (the same order buildAdjacencyList inserts its keys), and the
+    neighbours of node i are stored in targets[offsets[i]:offsets[i + 1]]. Coordinates are kept in the flat xs/ys
+    arrays and cellIndex maps a cell back to its node id, so no per-node Python objects are kept alive. components
+    holds the ComponentIndex of the graph once its components have been labelled (see components.getComponentIndex),
+    None until then. derived holds the structures the solvers build from the graph (see adjacency.getDerived).
+
+    The class also exposes enough of the dictionary interface (len, iteration, keys, item lookup by coordinate) for
+    the rest of the program to treat it like the adjacency list returned by buildAdjacencyList.
+    """
+
+    def __init__(self, xs: array, ys: array, offsets: array, targets: array, width: int, height: int, cellIndex: array,
+                 components=None):
+        self.xs = xs
+        self.ys = ys
+        self.offsets = offsets
+        self.targets = targets
+        self.width = width
+        self.height = height
+        self.cellIndex = cellIndex
+        # Number of cell slots per row in cellIndex (cells sit on every other column)
+        self.columns = (width + 1) // 2
+        self.components = components
+        self.derived = {}
+
+    def __len__(self) -> int:
+        return len(self.xs)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        # Iterate over the coordinates of every node in id order
+        return zip(self.xs, self.ys)
+
+    def __reversed__(self) -> Iterator[Tuple[int, int]]:
+        return zip(reversed(self.xs), reversed(self.ys))
+
+    def __contains__(self, node: Tuple[int, int]) -> bool:
+        return self.nodeId(node) != -1
+
+    def __getitem__(self, node: Tuple[int, int]) -> List[Tuple[int, int]]:
+        # Mirror the adjacency list interface, returning the neighbours of a coordinate as coordinates
+        i = self.nodeId(node)
+        if i == -1:
+            raise KeyError(node)
+        return [(self.xs[j], self.ys[j]) for j in self.neighbours(i)]
+
+    def keys(self) -> "CSRGraph":
+        return self
+
+    def nodeId(self, node: Tuple[int, int]) -> int:
+        """
+        Returns the integer id of the node at the given coordinate, or -1 if the cell is not an open node.
+
+        Args:
+            node (Tuple[int, int]): The (x, y) coordinate of the cell.
+
+        Returns:
+            int: The node id.
+        """
+        x, y = node
+        if x % 2 or not (0 <= x < self.width and 0 <= y < self.height):
+            return -1
+        return self.cellIndex[y * self.columns + x // 2]
+
+    def isOpen(self, x: int, y: int) -> bool:
+        """
+        Returns whether the cell at (x, y) is an open cell, so the graph can also stand in for the maze grid.
+        """
+        return self.nodeId((x, y)) != -1
+
+    def coordinate(self, i: int) -> Tuple[int, int]:
+        """
+        Returns the (x, y) coordinate of the node with the given id.
+        """
+        return self.xs[i], self.ys[i]
+
+    def neighbours(self, i: int) -> array:
+        """
+        Returns the ids of the neighbours of node i as a slice of the targets array.
+        """
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def toAdjacencyList(self) -> defaultdict:
+        """
+        Expands the graph back into the defaultdict format produced by buildAdjacencyList.
+
+        Returns:
+            defaultdict: A defaultdict mapping each (x, y) node to the list of its neighbours.
+        """
+        adjacencyList = defaultdict(list)
+        for node in self:
+            adjacencyList[node] = self[node]
+        return adjacencyList
+
+
+def buildCSRGraph(maze: List[str]) -> CSRGraph:
+    """
+    Build a CSRGraph from the list of strings returned by readMazeFile.
+
+    Neighbours are stored in the same order as returnNeighbours (up, down, right, left) so that searches over the
+    CSR graph visit nodes in the same order as searches over the adjacency list.
+
+    Args:
+        maze (list[str]): A list of strings representing the maze.
+
+    Returns:
+        CSRGraph: The compact graph representation of the maze.
+    """
+    height = len(maze)
+    width = max(len(row) for row in maze)
+    columns = (width + 1) // 2
+
+    # Number every open cell in row-major order
+    xs = array("i")
+    ys = array("i")
+    cellIndex = array("i", [-1]) * (height * columns)
+    for y, row in enumerate(maze):
+        base = y * columns
+        for x in range(0, len(row), 2):
+            if row[x] == "-":
+                cellIndex[base + x // 2] = len(xs)
+                xs.append(x)
+                ys.append(y)
+
+    # Record the neighbours of every node, treating anything outside the grid as a wall
+    offsets = array("i", [0])
+    targets = array("i")
+    for i in range(len(xs)):
+        cell = ys[i] * columns + xs[i] // 2
+        x = xs[i]
+        # Up
+        if cell >= columns and cellIndex[cell - columns] != -1:
+            targets.append(cellIndex[cell - columns])
+        # Down
+        if cell + columns < len(cellIndex) and cellIndex[cell + columns] != -1:
+            targets.append(cellIndex[cell + columns])
+        # Right
+        if x + 2 < width and cellIndex[cell + 1] != -1:
+            targets.append(cellIndex[cell + 1])
+        # Left
+        if x >= 2 and cellIndex[cell - 1] != -1:
+            targets.append(cellIndex[cell - 1])
+        offsets.append(len(targets))
+
+    return CSRGraph(xs, ys, offsets, targets, width, height, cellIndex)
+
+
+def labelCSRGraph(graph: CSRGraph) -> Tuple[array, int]:
+    """
+    Labels the connected components of a CSRGraph by flood fill over its arrays.
+
+    Returns:
+        Tuple[array, int]: The component label of every node id, and the number of components.
+    """
+    offsets, targets = graph.offsets, graph.targets
+    labels = array("i", [-1]) * len(graph)
+    count = 0
+    for start in range(len(graph)):
+        if labels[start] != -1:
+            continue
+        labels[start] = count
+        stack = [start]
+        while stack:
+            u = stack.pop()
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                if labels[v] == -1:
+                    labels[v] = count
+                    stack.append(v)
+        count += 1
+    return labels, count
+
+
+def buildCSRGraphFromAdjacencyList(adjacencyList) -> CSRGraph:
+    """
+    Build a CSRGraph from any graph with the adjacency list interface, numbering the nodes in iteration order and
+    keeping the neighbours of every node in the order the graph lists them. A CSRGraph is returned unchanged.
+
+    Args:
+        adjacencyList: The graph, such as the defaultdict returned by buildAdjacencyList or a LazyMazeGraph.
+
+    Returns:
+        CSRGraph: The compact graph representation of the maze.
+    """
+    if isinstance(adjacencyList, CSRGraph):
+        return adjacencyList
+
+    nodes = list(adjacencyList)
+    width = max((x for x, _ in nodes), default=-1) + 1
+    height = max((y for _, y in nodes), default=-1) + 1
+    columns = (width + 1) // 2
+
+    # Number every node in iteration order
+    xs = array("i", (x for x, _ in nodes))
+    ys = array("i", (y for _, y in nodes))
+    cellIndex = array("i", [-1]) * (height * columns)
+    for i, (x, y) in enumerate(nodes):
+        cellIndex[y * columns + x // 2] = i
+
+    # Record the neighbours of every node by id
+    offsets = array("i", [0])
+    targets = array("i")
+    for node in nodes:
+        targets.extend(cellIndex[y * columns + x // 2] for x, y in adjacencyList[node])
+        offsets.append(len(targets))
+
+    return CSRGraph(xs, ys, offsets, targets, width, height, cellIndex)
+
+
+def verifyGraph(graph, adjacencyList: defaultdict) -> bool:
+    """
+    Checks that a graph built by any backend, such as a CSRGraph, describes exactly the same nodes, neighbours and
+    neighbour order as an adjacency list built by buildAdjacencyList.
+
+    Args:
+        graph: The graph to check.
+        adjacencyList (defaultdict): The reference adjacency list.
+
+    Returns:
+        bool: True if the two graphs are identical.
+    """
+    return len(graph) == len(adjacencyList) and list(graph) == list(adjacencyList) and \
+        all(graph[node] == neighbours for node, neighbours in adjacencyList.items())
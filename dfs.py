@@ -1,8 +1,11 @@
+from array import array
 from collections import deque
-from typing import Dict, List, Tuple
+from typing import Dict, Generator, List, Tuple
+from csrgraph import CSRGraph
+from instrumentation import Progress, SearchMetrics
 
 
-def depthFirstSearch(adjacencyList: Dict[Tuple, List[Tuple]], root: Tuple, goal: Tuple) -> Tuple[Dict[Tuple, Tuple], int]:
+def depthFirstSearch(adjacencyList: Dict[Tuple, List[Tuple]], root: Tuple, goal: Tuple, metrics: SearchMetrics = None) -> Tuple[Dict[Tuple, Tuple], int]:
     """
     Traverses a graph represented by an adjacency list, starting from a specified root node, and searches for a goal node.
     
@@ -10,12 +13,16 @@ def depthFirstSearch(adjacencyList: Dict[Tuple, List[Tuple]], root: Tuple, goal:
         adjacencyList (dictionary of list): a dictionary that maps each node in the graph to a list of its adjacent nodes.
         root (tuple): the node to start the search from.
         goal (tuple): the node to search for.
+        metrics (SearchMetrics, optional): if given, the stack pushes, duplicate pops and peak stack size are counted into it.
     
     Returns:
         If the goal node is found, returns a tuple containing a dictionary that maps each visited node to its parent in the search tree, and the number of nodes explored during the traversal.
         If the goal node is not found, returns a tuple containing None for the path dictionary, and the number of nodes explored during the traversal.
     """
     
+    # Only count metrics when asked to, so the uninstrumented search pays a single check per step.
+    instrument = metrics is not None
+
     # Initialize an empty set to keep track of discovered nodes.
     discovered = set()
     
@@ -24,6 +31,9 @@ def depthFirstSearch(adjacencyList: Dict[Tuple, List[Tuple]], root: Tuple, goal:
     
     # Add the starting node to the queue.
     S.append(root)
+    if instrument:
+        metrics.pushes += 1
+        metrics.peakFrontier = max(metrics.peakFrontier, 1)
     
     # Initialize an empty dictionary to keep track of the path from each visited node to its parent.
     cameFrom = {}
@@ -39,6 +49,11 @@ def depthFirstSearch(adjacencyList: Dict[Tuple, List[Tuple]], root: Tuple, goal:
         
         # Increment the node counter.
         nodesExplored += 1
+
+        if instrument:
+            metrics.pops += 1
+            if v in discovered:
+                metrics.stalePops += 1
     
         # If the current node is the goal, return the dictionary map and the number of nodes explored.
         if v == goal:
@@ -62,6 +77,112 @@ def depthFirstSearch(adjacencyList: Dict[Tuple, List[Tuple]], root: Tuple, goal:
 
                 # Set the parent of the neighbour to the current node
                 cameFrom[w] = v
+
+                if instrument:
+                    metrics.pushes += 1
+                    metrics.peakFrontier = max(metrics.peakFrontier, len(S))
     
     # If the goal was not reached, return None for the path and the number of nodes explored.
     return None, nodesExplored
+
+
+def depthFirstSearchSteps(adjacencyList: Dict[Tuple, List[Tuple]], root: Tuple, goal: Tuple, every: int = 1000) -> Generator[Progress, None, Tuple[Dict[Tuple, Tuple], int]]:
+    """
+    A steppable version of depthFirstSearch, which pauses every `every` nodes explored so the caller can report
+    progress, enforce a deadline or give up on the search (see stepping.py).
+
+    Args:
+        adjacencyList (dictionary of list): a dictionary that maps each node in the graph to a list of its adjacent nodes.
+        root (tuple): the node to start the search from.
+        goal (tuple): the node to search for.
+        every (int): the number of nodes to explore between pauses.
+
+    Yields:
+        Progress: the number of nodes explored so far and the size of the stack.
+
+    Returns:
+        The same result as depthFirstSearch, as the value of the StopIteration that ends the generator.
+    """
+
+    # The discovered set, stack and parent map, as in depthFirstSearch.
+    discovered = set()
+    S = deque([root])
+    cameFrom = {}
+    nodesExplored = 0
+
+    # While there are nodes in the queue:
+    while S:
+        # Pop the last node from the queue.
+        v = S.pop()
+        nodesExplored += 1
+
+        # If the current node is the goal, return the dictionary map and the number of nodes explored.
+        if v == goal:
+            return cameFrom, nodesExplored
+
+        # Pause so the caller can check on the search.
+        if nodesExplored % every == 0:
+            yield Progress(nodesExplored, len(S))
+
+        # If the current node has not been discovered yet, mark it and push its undiscovered neighbours.
+        if v not in discovered:
+            discovered.add(v)
+            for w in adjacencyList[v]:
+                if w in discovered:
+                    continue
+                S.append(w)
+                cameFrom[w] = v
+
+    # If the goal was not reached, return None for the path and the number of nodes explored.
+    return None, nodesExplored
+
+
+def depthFirstSearchCSR(graph: CSRGraph, root: int, goal: int) -> Tuple[array, int]:
+    """
+    Depth first search that runs directly on a CSRGraph.
+
+    The discovered set and parent map are replaced by a bytearray and an integer array indexed by node id.
+
+    Args:
+        graph (CSRGraph): the compact graph representation of the maze.
+        root (int): the id of the node to start the search from.
+        goal (int): the id of the node to search for.
+
+    Returns:
+        If the goal node is found, returns a tuple containing an array that maps each node id to the id of its parent in the search tree (-1 if it has none), and the number of nodes explored during the traversal.
+        If the goal node is not found, returns a tuple containing None for the parent array, and the number of nodes explored during the traversal.
+    """
+
+    offsets, targets = graph.offsets, graph.targets
+
+    # One byte per node marks whether it has been discovered.
+    discovered = bytearray(len(graph))
+
+    # Parent of each node in the search tree, -1 when unknown.
+    cameFrom = array("i", [-1]) * len(graph)
+
+    # Stack of node ids to visit.
+    S = [root]
+
+    nodesExplored = 0
+
+    while S:
+        v = S.pop()
+        nodesExplored += 1
+
+        if v == goal:
+            return cameFrom, nodesExplored
+
+        if not discovered[v]:
+            discovered[v] = 1
+
+            # Push the undiscovered neighbours in the same order as depthFirstSearch.
+            for k in range(offsets[v], offsets[v + 1]):
+                w = targets[k]
+                if discovered[w]:
+                    continue
+                S.append(w)
+                cameFrom[w] = v
+
+    # If the goal was not reached, return None for the parents and the number of nodes explored.
+    return None, nodesExplored
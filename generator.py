@@ -0,0 +1,161 @@
+import argparse
+import random
+from typing import Dict, Iterator, List
+
+
+def _find(parent: Dict[int, int], label: int) -> int:
+    # Union-find lookup with path halving
+    while parent[label] != label:
+        parent[label] = parent[parent[label]]
+        label = parent[label]
+    return label
+
+
+def generateMazeRows(width: int, height: int, seed: int = None, loops: float = 0.0, rooms: float = 0.0) -> Iterator[str]:
+    """
+    Generates a maze one text row at a time using Eller's algorithm, so only a single row of cells is ever held in
+    memory.
+
+    The maze has `width` x `height` cells laid out on a (2 * width + 1) x (2 * height + 1) grid of walls and passages,
+    written in the "# - " format readMazeFile expects. There is a single entry on the top row and a single exit on the
+    bottom row. With loops and rooms both 0 the maze is perfect (exactly one path between any two cells).
+
+    Args:
+        width (int): The number of cells across the maze.
+        height (int): The number of cells down the maze.
+        seed (int): The random seed, the same seed and arguments always produce the same maze.
+        loops (float): The probability of removing a wall between two cells that are already connected.
+        rooms (float): The probability, per row, of opening a rectangular room starting on that row.
+
+    Yields:
+        str: The rows of the maze, without newline characters.
+    """
+    if width < 1 or height < 1:
+        raise ValueError("The maze must be at least 1 x 1 cells")
+
+    rng = random.Random(seed)
+
+    def render(cells: List[bool]) -> str:
+        # Lay the grid characters out on the 2-column stride with a trailing space, like the supplied mazes
+        return "".join("- " if cell else "# " for cell in cells)
+
+    # Top border with the entrance
+    border = [False] * (2 * width + 1)
+    border[2 * rng.randrange(width) + 1] = True
+    yield render(border)
+
+    # Every cell in the current row starts in its own set
+    labels = list(range(width))
+    parent = {label: label for label in labels}
+    nextLabel = width
+
+    # Active rooms as [first column, last column, rows remaining]
+    activeRooms = []
+
+    for r in range(height):
+        lastRow = r == height - 1
+
+        # Possibly start a new room on this row
+        if rooms and not lastRow and rng.random() < rooms:
+            first = rng.randrange(width)
+            last = min(width - 1, first + rng.randint(1, max(1, width // 8)))
+            activeRooms.append([first, last, min(height - r, rng.randint(2, max(2, height // 8)))])
+
+        # Which cells belong to a room on this row, and whether the room carries on below
+        inRoom = [0] * width
+        for first, last, remaining in activeRooms:
+            for col in range(first, last + 1):
+                inRoom[col] = max(inRoom[col], 2 if remaining > 1 else 1)
+
+        # Join horizontally adjacent cells
+        cellRow = [False] * (2 * width + 1)
+        for col in range(width):
+            cellRow[2 * col + 1] = True
+            if col == width - 1:
+                break
+            a, b = _find(parent, labels[col]), _find(parent, labels[col + 1])
+            if a != b:
+                join = lastRow or (inRoom[col] and inRoom[col + 1]) or rng.random() < 0.5
+            else:
+                join = (inRoom[col] and inRoom[col + 1]) or (loops and rng.random() < loops)
+            if join:
+                parent[b] = a
+                cellRow[2 * col + 2] = True
+        yield render(cellRow)
+
+        if lastRow:
+            break
+
+        # Group the columns of each set, every set must carry on into the next row at least once
+        members: Dict[int, List[int]] = {}
+        for col in range(width):
+            members.setdefault(_find(parent, labels[col]), []).append(col)
+
+        down = [False] * width
+        for root, cols in members.items():
+            for col in cols:
+                if inRoom[col] == 2 or rng.random() < 0.5:
+                    down[col] = True
+            if not any(down[col] for col in cols):
+                down[rng.choice(cols)] = True
+
+        # Vertical passages, plus the pillars inside rooms so they are fully open
+        passageRow = [False] * (2 * width + 1)
+        for col in range(width):
+            passageRow[2 * col + 1] = down[col]
+            if col < width - 1 and inRoom[col] == 2 and inRoom[col + 1] == 2 and cellRow[2 * col + 2]:
+                passageRow[2 * col + 2] = True
+        yield render(passageRow)
+
+        # Carry the set of every cell that went down, give the others fresh sets
+        newLabels = []
+        for col in range(width):
+            if down[col]:
+                newLabels.append(_find(parent, labels[col]))
+            else:
+                newLabels.append(nextLabel)
+                nextLabel += 1
+        labels = newLabels
+        parent = {label: label for label in labels}
+
+        # Age the active rooms
+        for room in activeRooms:
+            room[2] -= 1
+        activeRooms = [room for room in activeRooms if room[2] > 0]
+
+    # Bottom border with the exit
+    border = [False] * (2 * width + 1)
+    border[2 * rng.randrange(width) + 1] = True
+    yield render(border)
+
+
+def writeMaze(fileName: str, width: int, height: int, seed: int = None, loops: float = 0.0, rooms: float = 0.0) -> None:
+    """
+    Generates a maze with generateMazeRows and streams it to a file row by row.
+
+    Args:
+        fileName (str): The name of the file to write.
+        width (int): The number of cells across the maze.
+        height (int): The number of cells down the maze.
+        seed (int): The random seed.
+        loops (float): The probability of removing a wall between two cells that are already connected.
+        rooms (float): The probability, per row, of opening a rectangular room starting on that row.
+    """
+    with open(fileName, "w") as file:
+        for row in generateMazeRows(width, height, seed, loops, rooms):
+            file.write(row + "\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a maze file in the format read by main.py.")
+    parser.add_argument("width", type=int, help="number of cells across the maze")
+    parser.add_argument("height", type=int, help="number of cells down the maze")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="random seed (default: 0)")
+    parser.add_argument("-l", "--loops", type=float, default=0.0, help="probability of opening a wall that creates a loop (default: 0)")
+    parser.add_argument("-r", "--rooms", type=float, default=0.0, help="probability per row of starting an open room (default: 0)")
+    parser.add_argument("-o", "--output", help="file to write (default: maze-<width>x<height>-<seed>.txt)")
+    args = parser.parse_args()
+
+    output = args.output or f"maze-{args.width}x{args.height}-{args.seed}.txt"
+    writeMaze(output, args.width, args.height, args.seed, args.loops, args.rooms)
+    print(f"[*] Maze written to {output}")
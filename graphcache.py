@@ -0,0 +1,161 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Optional, Tuple
+
+from components import ComponentIndex, getComponentIndex
+from csrgraph import CSRGraph, buildCSRGraph
+
+CACHE_DIRECTORY = "cache/"
+
+# Identifies a graph cache file and the version of its layout
+MAGIC = b"MAZEGRPH"
+VERSION = 2
+
+# Header: magic, version, little endian flag, item size of the arrays, width, height, node count, neighbour count,
+# then the size, modification time and SHA-1 digest of the maze file the graph was built from, and the number of
+# connected components. A multiple of 8 bytes long so the arrays after it stay aligned.
+HEADER = struct.Struct("<8sIBBxxIIIIQq20sI")
+
+# Order in which the arrays of a CSRGraph follow the header, followed by the component label of every node
+FIELDS = ("xs", "ys", "offsets", "targets", "cellIndex")
+
+
+def graphCacheFileName(mazeFileName: str) -> str:
+    """
+    Returns the name of the file the preprocessed graph of a maze file is cached in. The name includes a hash of the
+    absolute path of the maze file, so maze files with the same name in different directories, or whose names only
+    differ after the first '.', never share a cache file.
+    """
+    digest = hashlib.sha1(os.path.abspath(mazeFileName).encode()).hexdigest()[:16]
+    return f"{CACHE_DIRECTORY}{os.path.basename(mazeFileName).split('.')[0]}-{digest}.graph"
+
+
+def fileDigest(fileName: str) -> bytes:
+    """
+    Returns the SHA-1 digest of the contents of a file, read in chunks.
+    """
+    digest = hashlib.sha1()
+    with open(fileName, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def writeGraphCache(fileName: str, graph: CSRGraph, mazeFileName: str, digest: bytes = None) -> None:
+    """
+    Writes a CSRGraph to a binary graph cache file: a header describing the graph and the maze file it was built
+    from, followed by the raw xs, ys, offsets, targets and cellIndex arrays and the component label of every node.
+    The components are labelled here if the graph does not hold them yet.
+
+    The file is written under a temporary name and then renamed, so a reader never sees a half written cache and
+    graphs already mapped from an older copy of the file stay valid.
+
+    Args:
+        fileName (str): The name of the cache file.
+        graph (CSRGraph): The graph to cache.
+        mazeFileName (str): The maze file the graph was built from.
+        digest (bytes, optional): The SHA-1 digest of the maze file, calculated if not given.
+    """
+    stat = os.stat(mazeFileName)
+    if digest is None:
+        digest = fileDigest(mazeFileName)
+    components = getComponentIndex(graph)
+    labels, count = components.labels, components.count
+
+    header = HEADER.pack(MAGIC, VERSION, sys.byteorder == "little", graph.xs.itemsize, graph.width, graph.height,
+                         len(graph.xs), len(graph.targets), stat.st_size, stat.st_mtime_ns, digest, count)
+
+    directory = os.path.dirname(fileName)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    temporary = f"{fileName}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(header)
+        for field in FIELDS:
+            f.write(getattr(graph, field).tobytes())
+        f.write(labels.tobytes())
+    os.replace(temporary, fileName)
+
+
+def openGraphCache(fileName: str) -> Optional[Tuple[tuple, CSRGraph]]:
+    """
+    Maps a graph cache file into memory and builds a CSRGraph over it without copying: the arrays of the graph are
+    memoryviews of the mapped file, and the mapping stays open for as long as the graph is in use.
+
+    Args:
+        fileName (str): The name of the cache file.
+
+    Returns:
+        The unpacked header and the graph, or None if the file is missing or was not written by this version on a
+        machine with the same byte order and array item size.
+    """
+    if not os.path.exists(fileName):
+        return None
+
+    with open(fileName, "rb") as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            return None
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    header = HEADER.unpack_from(mm)
+    magic, version, littleEndian, itemsize, width, height, nodes, edges = header[:8]
+    columns = (width + 1) // 2
+    lengths = (nodes, nodes, nodes + 1, edges, height * columns, nodes)
+    if magic != MAGIC or version != VERSION or littleEndian != (sys.byteorder == "little") or \
+            itemsize != array("i").itemsize or len(mm) != HEADER.size + sum(lengths) * itemsize:
+        mm.close()
+        return None
+
+    views = []
+    position = HEADER.size
+    buffer = memoryview(mm)
+    for length in lengths:
+        views.append(buffer[position:position + length * itemsize].cast("i"))
+        position += length * itemsize
+    xs, ys, offsets, targets, cellIndex, labels = views
+    components = ComponentIndex(labels, header[11], width, height, cellIndex)
+    return header, CSRGraph(xs, ys, offsets, targets, width, height, cellIndex, components)
+
+
+def loadCachedGraph(mazeFileName: str) -> CSRGraph:
+    """
+    Returns the CSRGraph of a maze file from the graph cache, parsing the maze and caching its graph if there is no
+    valid cached copy.
+
+    A cached graph is used straight away if the size and modification time of the maze file match the ones recorded
+    when it was cached. If only the modification time differs, the contents of the maze are hashed and the cached
+    graph is still used if they are unchanged. Otherwise the graph is rebuilt and the cache replaced.
+
+    Args:
+        mazeFileName (str): The name of the maze file.
+
+    Returns:
+        CSRGraph: The graph of the maze, backed by the mapped cache file and holding its component labels.
+    """
+    from main import readMazeFile
+
+    fileName = graphCacheFileName(mazeFileName)
+    stat = os.stat(mazeFileName)
+    digest = None
+
+    cached = openGraphCache(fileName)
+    if cached is not None:
+        header, graph = cached
+        size, mtime, cachedDigest = header[8:11]
+        if size == stat.st_size:
+            if mtime == stat.st_mtime_ns:
+                return graph
+            digest = fileDigest(mazeFileName)
+            if digest == cachedDigest:
+                # Record the new modification time so the next load skips the hash
+                with open(fileName, "r+b") as f:
+                    f.write(HEADER.pack(*header[:9], stat.st_mtime_ns, digest, header[11]))
+                return graph
+
+    writeGraphCache(fileName, buildCSRGraph(readMazeFile(mazeFileName)), mazeFileName, digest)
+    return openGraphCache(fileName)[1]
@@ -0,0 +1,270 @@
+from collections import deque
+from heapq import heappush, heappop
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from adjacency import getDerived
+from astar import cellDistance
+
+# Number of cells along each side of a tile
+TILE_SIZE = 16
+
+Tile = Tuple[int, int]
+
+
+class TileEntry(NamedTuple):
+    """
+    The part of the abstract graph inside one tile.
+    """
+    crossings: Dict[Tuple[int, int], List[Tuple[int, int]]]  # entrance -> cells across the border it steps to
+    distances: Dict[Tuple[int, int], Dict[Tuple[int, int], int]]  # entrance -> steps to the entrances it reaches
+
+
+class TileAbstraction:
+    """
+    The abstract graph of hierarchical pathfinding (HPA*) over a maze split into square tiles of TILE_SIZE cells.
+
+    Along every border between two tiles, each run of cells which are open on both sides gets one transition in the
+    middle of the run. The cells of a transition are the entrances of their tiles, joined by an edge of one step.
+    Inside a tile, every pair of entrances that can reach each other without leaving the tile is joined by an edge
+    weighted with the number of steps between them. Every open run along a border is a line of connected cells, so
+    any path through the maze can be rerouted through the entrances, and the abstract graph connects exactly the
+    cells the maze connects.
+
+    Tiles are built the first time a search reaches them and kept afterwards, so no query pays for tiles away from
+    its route, and cellsChanged rebuilds only the tiles around cells which changed.
+    """
+
+    def __init__(self, adjacencyList, tileSize: int = TILE_SIZE):
+        self.adjacencyList = adjacencyList
+        self.tileSize = tileSize
+        self.tiles: Dict[Tile, TileEntry] = {}
+        # Transitions of each border, keyed by the tile pair with the second tile to the right of or below the first
+        self.borders: Dict[Tuple[Tile, Tile], List[Tuple[Tuple[int, int], Tuple[int, int]]]] = {}
+
+    def tileOf(self, node: Tuple[int, int]) -> Tile:
+        x, y = node
+        return x // 2 // self.tileSize, y // self.tileSize
+
+    def isOpen(self, node: Tuple[int, int]) -> bool:
+        # Looking up a missing cell must not add it to a defaultdict
+        return node in self.adjacencyList
+
+    def border(self, first: Tile, second: Tile) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+        """
+        Returns the transitions across the border between two tiles, the second tile being to the right of or below
+        the first, as (cell in first tile, cell in second tile) pairs.
+        """
+        key = (first, second)
+        if key in self.borders:
+            return self.borders[key]
+
+        size = self.tileSize
+        (tx, ty), (sx, _) = first, second
+        if sx != tx:
+            # Vertical border, pairs of cells side by side
+            x = ((tx + 1) * size - 1) * 2
+            pairs = [((x, y), (x + 2, y)) for y in range(ty * size, (ty + 1) * size)]
+        else:
+            # Horizontal border, pairs of cells one above the other
+            y = (ty + 1) * size - 1
+            pairs = [((x, y), (x, y + 1)) for x in range(tx * size * 2, (tx + 1) * size * 2, 2)]
+
+        # Place one transition in the middle of every run of pairs open on both sides
+        transitions = []
+        run = []
+        for pair in pairs + [None]:
+            if pair is not None and self.isOpen(pair[0]) and self.isOpen(pair[1]):
+                run.append(pair)
+            elif run:
+                transitions.append(run[len(run) // 2])
+                run = []
+        self.borders[key] = transitions
+        return transitions
+
+    def searchTile(self, start: Tuple[int, int], tile: Tile,
+                   goal: Tuple[int, int] = None) -> Tuple[Dict[Tuple[int, int], Tuple[int, int]], Dict[Tuple[int, int], int]]:
+        """
+        Breadth first search from a cell which never leaves its tile, stopping early once the goal is reached if one
+        is given.
+
+        Returns:
+            The parent and the number of steps from the start of every cell reached.
+        """
+        size = self.tileSize
+        x0, y0 = tile[0] * size * 2, tile[1] * size
+        x1, y1 = x0 + size * 2, y0 + size
+        adjacencyList = self.adjacencyList
+
+        cameFrom = {start: None}
+        distance = {start: 0}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            if current == goal:
+                break
+            steps = distance[current] + 1
+            for neighbour in adjacencyList[current]:
+                x, y = neighbour
+                if neighbour not in distance and x0 <= x < x1 and y0 <= y < y1:
+                    cameFrom[neighbour] = current
+                    distance[neighbour] = steps
+                    queue.append(neighbour)
+        return cameFrom, distance
+
+    def tile(self, tile: Tile) -> TileEntry:
+        """
+        Returns the entrances of a tile and the distances between them, building them on the first call.
+        """
+        entry = self.tiles.get(tile)
+        if entry is not None:
+            return entry
+
+        tx, ty = tile
+        crossings = {}
+        for first, second, inside in (((tx - 1, ty), tile, 1), (tile, (tx + 1, ty), 0),
+                                      ((tx, ty - 1), tile, 1), (tile, (tx, ty + 1), 0)):
+            for pair in self.border(first, second):
+                crossings.setdefault(pair[inside], []).append(pair[1 - inside])
+
+        distances = {}
+        for entrance in crossings:
+            _, reached = self.searchTile(entrance, tile)
+            distances[entrance] = {other: reached[other] for other in crossings if other in reached and other != entrance}
+
+        entry = self.tiles[tile] = TileEntry(crossings, distances)
+        return entry
+
+    def cellsChanged(self, changed: List[Tuple[int, int]]) -> None:
+        """
+        Tells the abstraction which cells had their neighbours changed, as returned by incremental.setCell. The tiles
+        holding them and the tiles next to those are rebuilt the next time a search reaches them.
+        """
+        for node in changed:
+            tx, ty = self.tileOf(node)
+            for tile in ((tx, ty), (tx - 1, ty), (tx + 1, ty), (tx, ty - 1), (tx, ty + 1)):
+                self.tiles.pop(tile, None)
+            for key in (((tx - 1, ty), (tx, ty)), ((tx, ty), (tx + 1, ty)),
+                        ((tx, ty - 1), (tx, ty)), ((tx, ty), (tx, ty + 1))):
+                self.borders.pop(key, None)
+
+    def solve(self, root: Tuple[int, int], goal: Tuple[int, int]) -> Tuple[Optional[Dict], int]:
+        """
+        Finds a path with A* over the abstract graph, then refines each abstract edge on it into cells with a search
+        inside its tile.
+
+        The root and goal are joined to the entrances of their tiles for the query only. Both the abstract search and
+        the refinement cost in proportion to the length of the path rather than the area of the maze. The path is
+        not always a shortest path, since it passes through the entrances, but it is usually close.
+
+        Returns:
+            If the goal node is reachable, returns a tuple containing a dictionary that maps each node on the path to
+            its parent, and the number of abstract nodes expanded plus the cells visited joining the root and goal to
+            their tiles and refining the path.
+            If the goal node is not reachable, returns a tuple containing None for the path dictionary, and the
+            number of nodes explored.
+        """
+        if not (self.isOpen(root) and self.isOpen(goal)):
+            return None, 0
+
+        # Join the root and goal to the entrances of their tiles, and to each other if they share a tile
+        rootTile, goalTile = self.tileOf(root), self.tileOf(goal)
+        _, fromRoot = self.searchTile(root, rootTile)
+        _, toGoal = self.searchTile(goal, goalTile)
+        cellsVisited = len(fromRoot) + len(toGoal)
+        rootEdges = {entrance: fromRoot[entrance] for entrance in self.tile(rootTile).crossings if entrance in fromRoot}
+        if goal in fromRoot:
+            rootEdges[goal] = fromRoot[goal]
+        goalEdges = {entrance: toGoal[entrance] for entrance in self.tile(goalTile).crossings if entrance in toGoal}
+
+        def edges(node: Tuple[int, int]):
+            entry = self.tile(self.tileOf(node))
+            if node == root:
+                yield from rootEdges.items()
+            elif node in entry.distances:
+                yield from entry.distances[node].items()
+            for other in entry.crossings.get(node, ()):
+                yield other, 1
+            if node in goalEdges:
+                yield goal, goalEdges[node]
+
+        # A* over the abstract graph, the cell-step Manhattan distance never overestimates an abstract edge
+        distance = {root: 0}
+        parent = {root: None}
+        closed = set()
+        prioQueue = [(cellDistance(root, goal), 0, root)]
+        nodesExplored = 0
+        while prioQueue:
+            _, _, current = heappop(prioQueue)
+            if current in closed:
+                continue
+            closed.add(current)
+            nodesExplored += 1
+            if current == goal:
+                break
+            for neighbour, weight in edges(current):
+                tentative_distance = distance[current] + weight
+                if neighbour not in closed and tentative_distance < distance.get(neighbour, tentative_distance + 1):
+                    distance[neighbour] = tentative_distance
+                    parent[neighbour] = current
+                    heappush(prioQueue, (tentative_distance + cellDistance(neighbour, goal), -tentative_distance, neighbour))
+        else:
+            return None, nodesExplored + cellsVisited
+
+        # Refine the abstract path from the goal back to the root, walking each edge inside its tile
+        path = [goal]
+        node = goal
+        while node != root:
+            previous = parent[node]
+            if self.tileOf(previous) == self.tileOf(node):
+                cameFrom, reached = self.searchTile(previous, self.tileOf(node), node)
+                cellsVisited += len(reached)
+                cell = cameFrom[node]
+                while cell is not None:
+                    path.append(cell)
+                    cell = cameFrom[cell]
+            else:
+                path.append(previous)
+            node = previous
+
+        # Cut out any loops where the path passes through a cell twice, then link every cell to the one before it
+        path.reverse()
+        ordered = []
+        position = {}
+        for cell in path:
+            if cell in position:
+                for removed in ordered[position[cell] + 1:]:
+                    del position[removed]
+                del ordered[position[cell] + 1:]
+                continue
+            position[cell] = len(ordered)
+            ordered.append(cell)
+
+        cameFrom = {root: None}
+        for previous, cell in zip(ordered, ordered[1:]):
+            cameFrom[cell] = previous
+        return cameFrom, nodesExplored + cellsVisited
+
+
+def getTileAbstraction(adjacencyList) -> TileAbstraction:
+    """
+    Returns the tile abstraction of a maze graph, creating it on the first call and reusing it, along with every tile
+    built so far, afterwards. The tile abstraction is kept on the graph itself, under the name "tiles".
+    """
+    return getDerived(adjacencyList, "tiles", TileAbstraction)
+
+
+def updateTileAbstraction(adjacencyList, changed: List[Tuple[int, int]]) -> None:
+    """
+    Tells the tile abstraction of a graph, if it has one, which cells changed, so only the tiles around them are
+    rebuilt.
+    """
+    tiles = getattr(adjacencyList, "derived", {}).get("tiles")
+    if tiles is not None:
+        tiles.cellsChanged(changed)
+
+
+def hierarchicalAStar(adjacencyList, root: Tuple[int, int], goal: Tuple[int, int]) -> Tuple[Optional[Dict], int]:
+    """
+    Solves a maze with HPA* over the tile abstraction from getTileAbstraction, for use alongside the other solvers.
+    """
+    return getTileAbstraction(adjacencyList).solve(root, goal)
@@ -0,0 +1,192 @@
+from heapq import heappush, heappop
+from typing import Dict, List, Optional, Tuple
+
+from astar import cellDistance
+from jps import openCellTest
+
+INFINITY = float("inf")
+
+
+def setCell(maze: List[str], adjacencyList: Dict[Tuple[int, int], List[Tuple[int, int]]], x: int, y: int,
+            isOpen: bool) -> List[Tuple[int, int]]:
+    """
+    Opens or closes a cell of a loaded maze, updating the maze and its adjacency list in place. Only the cell and its
+    four neighbours are touched, the rest of the adjacency list is left as it is.
+
+    A newly opened cell is added to the end of the adjacency list, so find the endpoints of the maze with
+    findEndpoints before changing any cells. The component index the adjacency list was built with, if any, is
+    updated along with it.
+
+    Args:
+        maze (list[str]): The list of strings returned by readMazeFile.
+        adjacencyList (dict): The adjacency list built from the maze by buildAdjacencyList.
+        x (int): The x-coordinate of the cell, which must be even.
+        y (int): The y-coordinate of the cell.
+        isOpen (bool): True to open the cell, False to close it.
+
+    Returns:
+        list[tuple]: The cells whose neighbours changed, the cell itself first. Empty if the cell was already in the
+        requested state.
+
+    Raises:
+        ValueError: If (x, y) is not a cell of the maze.
+    """
+    if x % 2 or not (0 <= y < len(maze) and 0 <= x < len(maze[y])):
+        raise ValueError(f"({x}, {y}) is not a cell of the maze")
+
+    cell = (x, y)
+    if (maze[y][x] == "-") == isOpen:
+        return []
+    maze[y] = maze[y][:x] + ("-" if isOpen else "#") + maze[y][x + 1:]
+
+    # Recalculate the neighbours of the cell and of every open cell next to it, in the order returnNeighbours uses
+    cellIsOpen = openCellTest(maze)
+    changed = [cell]
+    for nx, ny in ((x, y - 1), (x, y + 1), (x + 2, y), (x - 2, y)):
+        if cellIsOpen(nx, ny):
+            changed.append((nx, ny))
+    for cx, cy in changed:
+        if cellIsOpen(cx, cy):
+            adjacencyList[(cx, cy)] = [(nx, ny) for nx, ny in ((cx, cy - 1), (cx, cy + 1), (cx + 2, cy), (cx - 2, cy))
+                                       if cellIsOpen(nx, ny)]
+        else:
+            adjacencyList.pop((cx, cy), None)
+
+    components = getattr(adjacencyList, "components", None)
+    if components is not None:
+        components.cellsChanged(adjacencyList, changed)
+    return changed
+
+
+class IncrementalPlanner:
+    """
+    Lifelong Planning A* (LPA*) between a fixed root and goal.
+
+    The planner keeps the distance estimate g and the one step lookahead rhs of every node it has touched between
+    solves. When cells change, only the nodes next to the changes are re-examined, and the search repairs the
+    estimates that became wrong, so the work done is proportional to the part of the maze the change affects rather
+    than to the whole maze. The cell-step Manhattan distance is used as the heuristic since LPA* needs a consistent
+    one.
+
+    Works on any graph supporting `node in graph` and graph[node], and on the adjacency list of a maze changed with
+    setCell or IncrementalPlanner.setCell.
+    """
+
+    def __init__(self, adjacencyList, root: Tuple[int, int], goal: Tuple[int, int]):
+        self.adjacencyList = adjacencyList
+        self.root = root
+        self.goal = goal
+        self.g: Dict[Tuple[int, int], float] = {}
+        self.rhs: Dict[Tuple[int, int], float] = {root: 0} if root in adjacencyList else {}
+        # Priority queue with lazy deletion, queued holds the current key of every node that is really queued
+        self.queue = []
+        self.queued: Dict[Tuple[int, int], Tuple[float, float]] = {}
+        if root in adjacencyList:
+            self.push(root)
+
+    def neighbours(self, node: Tuple[int, int]):
+        # Closed cells have no neighbours, and looking them up must not add them to a defaultdict
+        return self.adjacencyList[node] if node in self.adjacencyList else ()
+
+    def key(self, node: Tuple[int, int]) -> Tuple[float, float]:
+        best = min(self.g.get(node, INFINITY), self.rhs.get(node, INFINITY))
+        return best + cellDistance(node, self.goal), best
+
+    def push(self, node: Tuple[int, int]) -> None:
+        key = self.key(node)
+        self.queued[node] = key
+        heappush(self.queue, (key, node))
+
+    def updateNode(self, node: Tuple[int, int]) -> None:
+        """
+        Recalculates the rhs of a node from its neighbours and queues it if it is inconsistent (g differs from rhs).
+        """
+        if node == self.root:
+            self.rhs[node] = 0 if node in self.adjacencyList else INFINITY
+        else:
+            g = self.g
+            self.rhs[node] = min((g.get(neighbour, INFINITY) + 1 for neighbour in self.neighbours(node)), default=INFINITY)
+
+        self.queued.pop(node, None)
+        if self.g.get(node, INFINITY) != self.rhs[node]:
+            self.push(node)
+
+    def topKey(self) -> Tuple[float, float]:
+        # Discard entries which were re-queued with a new key or removed from the queue
+        while self.queue and self.queued.get(self.queue[0][1]) != self.queue[0][0]:
+            heappop(self.queue)
+        return self.queue[0][0] if self.queue else (INFINITY, INFINITY)
+
+    def computeShortestPath(self) -> int:
+        """
+        Expands inconsistent nodes until the distance to the goal is known.
+
+        Returns:
+            int: The number of nodes expanded.
+        """
+        g, rhs, goal = self.g, self.rhs, self.goal
+        nodesExplored = 0
+        while self.topKey() < self.key(goal) or rhs.get(goal, INFINITY) != g.get(goal, INFINITY):
+            if not self.queue:
+                break
+            _, node = heappop(self.queue)
+            del self.queued[node]
+            nodesExplored += 1
+
+            if g.get(node, INFINITY) > rhs[node]:
+                # The node is overconsistent, its distance has dropped
+                g[node] = rhs[node]
+            else:
+                # The node is underconsistent, its distance has risen, so its neighbours need rechecking
+                g[node] = INFINITY
+                self.updateNode(node)
+            for neighbour in self.neighbours(node):
+                self.updateNode(neighbour)
+        return nodesExplored
+
+    def cellsChanged(self, changed: List[Tuple[int, int]]) -> None:
+        """
+        Tells the planner which cells had their neighbours changed, as returned by setCell.
+        """
+        for node in changed:
+            self.updateNode(node)
+
+    def setCell(self, maze: List[str], x: int, y: int, isOpen: bool) -> List[Tuple[int, int]]:
+        """
+        Opens or closes a cell of the maze with setCell and tells the planner which cells changed.
+        """
+        changed = setCell(maze, self.adjacencyList, x, y, isOpen)
+        self.cellsChanged(changed)
+        return changed
+
+    def solve(self) -> Tuple[Optional[Dict[Tuple[int, int], Tuple[int, int]]], int]:
+        """
+        Brings the shortest path up to date, reusing the work of earlier solves.
+
+        Returns:
+            If the goal node is reachable, returns a tuple containing a dictionary that maps each node on a shortest
+            path to its parent, and the number of nodes expanded by this solve.
+            If the goal node is not reachable, returns a tuple containing None for the path dictionary, and the
+            number of nodes expanded by this solve.
+        """
+        nodesExplored = self.computeShortestPath()
+
+        g = self.g
+        if g.get(self.goal, INFINITY) == INFINITY:
+            return None, nodesExplored
+
+        # Walk back from the goal, stepping to the neighbour closest to the root each time
+        cameFrom = {self.root: None}
+        current = self.goal
+        while current != self.root:
+            parent = min(self.neighbours(current), key=lambda neighbour: g.get(neighbour, INFINITY))
+            cameFrom[current] = parent
+            current = parent
+        return cameFrom, nodesExplored
+
+
+def lifelongPlanningAStar(adjacencyList, root: Tuple[int, int], goal: Tuple[int, int]) -> Tuple[Optional[Dict], int]:
+    """
+    Solves a maze from scratch with a new IncrementalPlanner, for use alongside the other solvers.
+    """
+    return IncrementalPlanner(adjacencyList, root, goal).solve()
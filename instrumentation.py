@@ -0,0 +1,109 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Tuple
+
+
+class Progress(NamedTuple):
+    """
+    A snapshot of a search in progress, yielded by the steppable solvers.
+    """
+    nodesExplored: int  # nodes explored so far
+    frontierSize: int  # nodes waiting on the priority queue or stack
+
+
+class SearchMetrics:
+    """
+    Counters and timings collected from a single solve.
+
+    Pass an instance to aStarSolver or depthFirstSearch (or to solveMaze) to enable instrumentation; when no instance
+    is passed the solvers skip every counter.
+
+    Attributes:
+        pushes (int): Nodes pushed onto the priority queue (A*) or stack (DFS).
+        pops (int): Nodes taken off the priority queue or stack.
+        stalePops (int): Pops of a node that had already been expanded, so the pop did no useful work.
+        peakFrontier (int): The largest size the priority queue or stack reached.
+        heuristicCacheHits (int): Heuristic values A* found in its cache.
+        heuristicCacheMisses (int): Heuristic values A* had to calculate.
+        peakMemory (int): The peak memory allocated during the search in bytes, if traced with tracemalloc.
+        phases (dict): The time taken by each phase of the solve (parse, build, search, backtrack, save) in seconds.
+    """
+
+    def __init__(self, traceMemory: bool = False):
+        self.traceMemory = traceMemory
+        self.pushes = 0
+        self.pops = 0
+        self.stalePops = 0
+        self.peakFrontier = 0
+        self.heuristicCacheHits = 0
+        self.heuristicCacheMisses = 0
+        self.peakMemory = None
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Times the enclosed block and records it as the given phase.
+        """
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.phases[name] = (time.perf_counter_ns() - start) / 1e9
+
+    @contextmanager
+    def memory(self) -> Iterator[None]:
+        """
+        Records the peak memory allocated in the enclosed block with tracemalloc, if memory tracing is enabled.
+        """
+        if not self.traceMemory:
+            yield
+            return
+
+        # Leave tracing as it was if something else already started it
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        try:
+            yield
+        finally:
+            self.peakMemory = tracemalloc.get_traced_memory()[1] - baseline
+            if started:
+                tracemalloc.stop()
+
+    def rows(self) -> List[Tuple[str, str]]:
+        """
+        Returns the metrics as (statistic, value) rows for statsTable.
+        """
+        rows = [
+            ("Pushes", str(self.pushes)),
+            ("Pops", str(self.pops)),
+            ("Stale/duplicate pops", str(self.stalePops)),
+            ("Peak frontier size", str(self.peakFrontier)),
+        ]
+        if self.heuristicCacheHits or self.heuristicCacheMisses:
+            rows.append(("Heuristic cache hits", f"{self.heuristicCacheHits}/{self.heuristicCacheHits + self.heuristicCacheMisses}"))
+        if self.peakMemory is not None:
+            rows.append(("Peak memory during search", f"{round(self.peakMemory / 1024 / 1024, 3)} MiB"))
+        for name, seconds in self.phases.items():
+            rows.append((f"Time to {name}", f"{round(seconds, 7)} seconds"))
+        return rows
+
+    def asDict(self) -> dict:
+        """
+        Returns the metrics as a dictionary, ready to be written out as JSON.
+        """
+        return {
+            "pushes": self.pushes,
+            "pops": self.pops,
+            "stalePops": self.stalePops,
+            "peakFrontier": self.peakFrontier,
+            "heuristicCacheHits": self.heuristicCacheHits,
+            "heuristicCacheMisses": self.heuristicCacheMisses,
+            "peakMemory": self.peakMemory,
+            "phases": dict(self.phases),
+        }
@@ -0,0 +1,160 @@
+from heapq import heappush, heappop
+from typing import Callable, Dict, Optional, Tuple
+
+from astar import cellDistance
+
+
+def openCellTest(maze) -> Callable[[int, int], bool]:
+    """
+    Returns a function telling whether the cell at (x, y) of a maze is open, treating anything outside the maze as
+    a wall.
+
+    Args:
+        maze: The list of strings returned by readMazeFile, or any maze object with an isOpen(x, y) method such as
+          LazyMazeGraph.
+
+    Returns:
+        callable: A function taking x and y and returning True for open cells.
+    """
+    if hasattr(maze, "isOpen"):
+        return maze.isOpen
+
+    height = len(maze)
+
+    def isOpen(x: int, y: int) -> bool:
+        return 0 <= y < height and 0 <= x < len(maze[y]) and maze[y][x] == "-"
+
+    return isOpen
+
+
+def jumpHorizontal(isOpen: Callable, x: int, y: int, dx: int, goal: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+    """
+    Moves along a row from (x, y) in steps of dx (2 columns, the horizontal stride of the maze) until reaching the
+    goal, a wall, or a cell with a forced vertical neighbour: an open cell above or below that could not have been
+    reached as quickly by turning one step earlier, because the cell behind it is a wall.
+
+    Returns:
+        The jump point reached, or None if the run ends at a wall.
+    """
+    while True:
+        x += dx
+        if not isOpen(x, y):
+            return None
+        if (x, y) == goal:
+            return x, y
+        if (isOpen(x, y - 1) and not isOpen(x - dx, y - 1)) or (isOpen(x, y + 1) and not isOpen(x - dx, y + 1)):
+            return x, y
+
+
+def jumpVertical(isOpen: Callable, x: int, y: int, dy: int, goal: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+    """
+    Moves along a column from (x, y) in steps of dy until reaching the goal, a wall, or a cell from which a
+    horizontal jump finds a jump point. Vertical moves play the part that diagonal moves play in 8-connected jump
+    point search.
+
+    Returns:
+        The jump point reached, or None if the run ends at a wall.
+    """
+    while True:
+        y += dy
+        if not isOpen(x, y):
+            return None
+        if (x, y) == goal:
+            return x, y
+        if jumpHorizontal(isOpen, x, y, 2, goal) is not None or jumpHorizontal(isOpen, x, y, -2, goal) is not None:
+            return x, y
+
+
+def jumpPointSearch(maze, root: Tuple[int, int], goal: Tuple[int, int]) -> Tuple[Dict[Tuple, Tuple], int]:
+    """
+    Jump point search over the maze grid, for a 4-connected grid with uniform step costs.
+
+    Instead of pushing every cell onto the heap, each successor is found by jumping along a straight run until a cell
+    where the path might have to turn. Paths are ordered so that vertical moves come before horizontal ones when both
+    orders are equally short, which lets horizontal runs ignore any vertical opening that could have been taken one
+    step earlier. With the admissible cellDistance heuristic the path found is a shortest path.
+
+    Args:
+        maze: The list of strings returned by readMazeFile (or a LazyMazeGraph).
+        root (tuple): the node to start the search from.
+        goal (tuple): the node to search for.
+
+    Returns:
+        If the goal node is found, returns a tuple containing a dictionary that maps each node on the path to its parent, and the number of jump points explored during the traversal.
+        If the goal node is not found, returns a tuple containing None for the path dictionary, and the number of jump points explored during the traversal.
+    """
+    isOpen = openCellTest(maze)
+    if not isOpen(*root):
+        return None, 0
+
+    distance = {root: 0}
+    jumpParents = {root: None}
+    prioQueue = [(cellDistance(root, goal), root)]
+    nodesExplored = 0
+
+    while prioQueue:
+        priority, current = heappop(prioQueue)
+        nodesExplored += 1
+
+        if current == goal:
+            return expandJumps(jumpParents, root, goal), nodesExplored
+
+        # Skip entries made stale by a later, shorter distance
+        if priority > distance[current] + cellDistance(current, goal):
+            continue
+
+        x, y = current
+        parent = jumpParents[current]
+
+        # Work out which directions to jump in from the direction the current node was reached in
+        if parent is None:
+            directions = [(2, 0), (-2, 0), (0, 1), (0, -1)]
+        elif parent[1] == y:
+            dx = 2 if x > parent[0] else -2
+            directions = [(dx, 0)]
+            for dy in (-1, 1):
+                if isOpen(x, y + dy) and not isOpen(x - dx, y + dy):
+                    directions.append((0, dy))
+        else:
+            dy = 1 if y > parent[1] else -1
+            directions = [(0, dy), (2, 0), (-2, 0)]
+
+        for dx, dy in directions:
+            if dy == 0:
+                jumpPoint = jumpHorizontal(isOpen, x, y, dx, goal)
+            else:
+                jumpPoint = jumpVertical(isOpen, x, y, dy, goal)
+            if jumpPoint is None:
+                continue
+
+            tentative_distance = distance[current] + cellDistance(current, jumpPoint)
+            if tentative_distance < distance.get(jumpPoint, float('inf')):
+                distance[jumpPoint] = tentative_distance
+                jumpParents[jumpPoint] = current
+                heappush(prioQueue, (tentative_distance + cellDistance(jumpPoint, goal), jumpPoint))
+
+    return None, nodesExplored
+
+
+def expandJumps(jumpParents: Dict[Tuple, Tuple], root: Tuple[int, int], goal: Tuple[int, int]) -> Dict[Tuple, Tuple]:
+    """
+    Expands the map of parents between jump points into a map of parents over every cell of the path, filling in the
+    straight run between each jump point and its parent.
+
+    Returns:
+        dict: A map from each cell on the path to the cell before it, which backtrackSolution can follow.
+    """
+    cameFrom = {root: None}
+    node = goal
+    while node != root:
+        parent = jumpParents[node]
+        # Step from the parent towards the node, one cell at a time
+        dx = (node[0] > parent[0]) - (node[0] < parent[0])
+        dy = (node[1] > parent[1]) - (node[1] < parent[1])
+        previous = parent
+        while previous != node:
+            current = (previous[0] + 2 * dx, previous[1] + dy)
+            cameFrom[current] = previous
+            previous = current
+        node = parent
+    return cameFrom
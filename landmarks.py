@@ -0,0 +1,286 @@
+import os
+import struct
+import sys
+from array import array
+from heapq import heappush, heappop
+from typing import Dict, List, Optional, Tuple
+
+from adjacency import getDerived, setDerived
+from astar import cellDistance
+from csrgraph import CSRGraph, buildCSRGraphFromAdjacencyList
+from graphcache import CACHE_DIRECTORY, fileDigest
+
+# Identifies a landmark cache file and the version of its layout
+MAGIC = b"MAZELMKS"
+VERSION = 1
+
+# Header: magic, version, little endian flag, number of landmarks, number of nodes, width, height
+HEADER = struct.Struct("<8sIB3xIIII")
+
+# Number of landmarks picked by default, and the number of them used by a single query
+LANDMARKS = 8
+ACTIVE_LANDMARKS = 4
+
+
+class LandmarkTable:
+    """
+    Exact distances from a few landmark cells to every node of a maze, for the ALT (A*, landmarks and triangle
+    inequality) heuristic.
+
+    For any landmark L, |d(L, goal) - d(L, v)| is a lower bound on d(v, goal), so the largest bound over the
+    landmarks is an admissible and consistent heuristic which, unlike the Manhattan distance, knows about the walls.
+
+    Nodes are numbered as in the CSRGraph of the maze; cellIndex maps a cell to its node id and distances holds one
+    flat array per landmark, with -1 for nodes the landmark cannot reach.
+    """
+
+    def __init__(self, landmarks: array, distances: List[array], width: int, height: int, cellIndex: array):
+        self.landmarks = landmarks
+        self.distances = distances
+        self.width = width
+        self.height = height
+        self.cellIndex = cellIndex
+        # Number of cell slots per row in cellIndex (cells sit on every other column)
+        self.columns = (width + 1) // 2
+
+    def __len__(self) -> int:
+        return len(self.landmarks)
+
+    def nodeId(self, node: Tuple[int, int]) -> int:
+        """
+        Returns the node id of a cell, or -1 if it is not a node of the maze.
+        """
+        x, y = node
+        if x % 2 or not (0 <= x < self.width and 0 <= y < self.height):
+            return -1
+        return self.cellIndex[y * self.columns + x // 2]
+
+    def lowerBound(self, node: Tuple[int, int], goal: Tuple[int, int]) -> int:
+        """
+        Returns the best lower bound the landmarks give on the distance between two nodes.
+        """
+        i, j = self.nodeId(node), self.nodeId(goal)
+        bound = cellDistance(node, goal)
+        for table in self.distances:
+            di, dj = table[i], table[j]
+            if di >= 0 and dj >= 0:
+                bound = max(bound, abs(di - dj))
+        return bound
+
+
+def bfsDistances(graph: CSRGraph, source: int) -> array:
+    """
+    Returns the number of steps from a node to every node of a CSRGraph, -1 for nodes it cannot reach.
+    """
+    offsets, targets = graph.offsets, graph.targets
+    distance = array("i", [-1]) * len(graph)
+    distance[source] = 0
+    frontier = [source]
+    steps = 0
+    while frontier:
+        steps += 1
+        layer = []
+        for u in frontier:
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                if distance[v] < 0:
+                    distance[v] = steps
+                    layer.append(v)
+        frontier = layer
+    return distance
+
+
+def buildLandmarks(adjacencyList, count: int = LANDMARKS) -> LandmarkTable:
+    """
+    Picks landmarks by farthest point selection and computes their distance tables. The first landmark is the node
+    farthest from the first node of the maze, and each following one is the node farthest from every landmark picked
+    so far, which spreads the landmarks out to the far corners and dead ends of the maze.
+
+    Args:
+        adjacencyList: The graph of the maze.
+        count (int): The number of landmarks to pick.
+
+    Returns:
+        LandmarkTable: The landmarks and their distance tables.
+    """
+    graph = buildCSRGraphFromAdjacencyList(adjacencyList)
+    landmarks = array("i")
+    distances = []
+    if len(graph):
+        # Distance from each node to the nearest landmark picked so far, unreachable nodes are never picked
+        nearest = bfsDistances(graph, 0)
+        for _ in range(min(count, len(graph))):
+            landmark = max(range(len(graph)), key=nearest.__getitem__)
+            if landmarks and nearest[landmark] <= 0:
+                break
+            table = bfsDistances(graph, landmark)
+            # Every landmark shares the component of the first node, so the -1 of unreachable nodes is kept
+            nearest = array("i", map(min, nearest, table)) if landmarks else table
+            landmarks.append(landmark)
+            distances.append(table)
+
+    return LandmarkTable(landmarks, distances, graph.width, graph.height, graph.cellIndex)
+
+
+def getLandmarks(adjacencyList) -> LandmarkTable:
+    """
+    Returns the landmark table of a maze graph, building it on the first call and reusing it afterwards. The table
+    is kept on the graph itself, under the name "landmarks".
+    """
+    return getDerived(adjacencyList, "landmarks", buildLandmarks)
+
+
+def landmarkCacheFileName(mazeFileName: str) -> str:
+    """
+    Returns the name of the file the landmark table of a maze file is cached in. The name includes a hash of the
+    contents of the maze, so a changed maze never loads stale distances.
+    """
+    digest = fileDigest(mazeFileName).hex()[:16]
+    return f"{CACHE_DIRECTORY}{os.path.basename(mazeFileName).split('.')[0]}-{digest}.landmarks"
+
+
+def writeLandmarks(fileName: str, table: LandmarkTable) -> None:
+    """
+    Writes a landmark table as a header followed by the raw landmark, cellIndex and distance arrays.
+    """
+    directory = os.path.dirname(fileName)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    nodes = len(table.distances[0]) if table.distances else 0
+    temporary = f"{fileName}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, sys.byteorder == "little", len(table), nodes, table.width, table.height))
+        table.landmarks.tofile(f)
+        table.cellIndex.tofile(f)
+        for distances in table.distances:
+            distances.tofile(f)
+    os.replace(temporary, fileName)
+
+
+def readLandmarks(fileName: str) -> Optional[LandmarkTable]:
+    """
+    Reads a landmark table written by writeLandmarks, or returns None if the file is missing or was written by
+    another version or on a machine with a different byte order.
+    """
+    if not os.path.exists(fileName):
+        return None
+
+    with open(fileName, "rb") as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return None
+        magic, version, littleEndian, count, nodes, width, height = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION or littleEndian != (sys.byteorder == "little"):
+            return None
+
+        try:
+            landmarks = array("i")
+            landmarks.fromfile(f, count)
+            cellIndex = array("i")
+            cellIndex.fromfile(f, height * ((width + 1) // 2))
+            distances = []
+            for _ in range(count):
+                table = array("i")
+                table.fromfile(f, nodes)
+                distances.append(table)
+        except EOFError:
+            return None
+
+    return LandmarkTable(landmarks, distances, width, height, cellIndex)
+
+
+def loadLandmarks(mazeFileName: str, adjacencyList, count: int = LANDMARKS) -> LandmarkTable:
+    """
+    Loads the landmark table of a maze file from the cache, building and caching it if there is no cached copy yet.
+    The table is also kept on the graph for getLandmarks.
+
+    Args:
+        mazeFileName (str): The name of the maze file.
+        adjacencyList: The graph built from the maze file.
+        count (int): The number of landmarks to pick if the table has to be built.
+
+    Returns:
+        LandmarkTable: The landmark table.
+    """
+    fileName = landmarkCacheFileName(mazeFileName)
+    table = readLandmarks(fileName)
+    if table is None:
+        table = buildLandmarks(adjacencyList, count)
+        writeLandmarks(fileName, table)
+
+    setDerived(adjacencyList, "landmarks", table)
+    return table
+
+
+def aStarLandmarks(adjacencyList, root: Tuple[int, int], goal: Tuple[int, int]) -> Tuple[Optional[Dict], int]:
+    """
+    A* guided by the landmark (ALT) lower bound, using the landmark table from getLandmarks.
+
+    Only the ACTIVE_LANDMARKS landmarks giving the best bound between the root and goal are consulted for each node,
+    which keeps the heuristic cheap while keeping nearly all of its strength. The heuristic is consistent, so a node
+    is never expanded twice and the path found is a shortest path. Ties are broken towards the node furthest from
+    the root.
+
+    Args:
+        adjacencyList: The graph of the maze.
+        root (tuple): The node to start the search from.
+        goal (tuple): The node to search for.
+
+    Returns:
+        If the goal node is found, returns a tuple containing a dictionary that maps each visited node to its parent in
+        the search tree, and the number of nodes explored during the traversal.
+        If the goal node is not found, returns a tuple containing None for the path dictionary, and the number of nodes
+        explored during the traversal.
+    """
+    table = getLandmarks(adjacencyList)
+    cellIndex, columns = table.cellIndex, table.columns
+    goalX, goalY = goal
+
+    # Pick the landmarks which bound the root to goal distance best
+    rootId, goalId = table.nodeId(root), table.nodeId(goal)
+    active = []
+    if rootId >= 0 and goalId >= 0:
+        ranked = sorted(table.distances, key=lambda d: -abs(d[rootId] - d[goalId]) if d[rootId] >= 0 and d[goalId] >= 0 else 1)
+        active = [(d, d[goalId]) for d in ranked[:ACTIVE_LANDMARKS] if d[goalId] >= 0]
+
+    # Every node the search reaches shares the component of the root, so when the goal is reachable no node has a
+    # distance of -1 in the active tables
+    def heuristic(node: Tuple[int, int]) -> int:
+        x, y = node
+        bound = abs(x - goalX) // 2 + abs(y - goalY)
+        i = cellIndex[y * columns + x // 2]
+        for distances, toGoal in active:
+            d = distances[i] - toGoal
+            if d < 0:
+                d = -d
+            if d > bound:
+                bound = d
+        return bound
+
+    distance = {root: 0}
+    cameFrom = {root: None}
+    closed = set()
+    prioQueue = [(heuristic(root), 0, root)]
+    nodesExplored = 0
+
+    while prioQueue:
+        _, _, current = heappop(prioQueue)
+        # Skip nodes already expanded through a shorter path
+        if current in closed:
+            continue
+        closed.add(current)
+        nodesExplored += 1
+
+        if current == goal:
+            return cameFrom, nodesExplored
+
+        tentative_distance = distance[current] + 1
+        for neighbor in adjacencyList[current]:
+            if neighbor in closed or tentative_distance >= distance.get(neighbor, tentative_distance + 1):
+                continue
+            distance[neighbor] = tentative_distance
+            cameFrom[neighbor] = current
+            heappush(prioQueue, (tentative_distance + heuristic(neighbor), -tentative_distance, neighbor))
+
+    return None, nodesExplored
@@ -0,0 +1,146 @@
+import mmap
+from array import array
+from typing import Dict, Iterator, List, Tuple
+
+# Character code of an open cell
+OPEN = ord("-")
+
+
+class LazyMazeGraph:
+    """
+    A read-only graph over a memory-mapped maze file.
+
+    Only the offset and length of every row are found up front; the neighbours of a cell are computed on demand from
+    the mapped bytes whenever adjacencyList[node] is looked up. Memory use therefore grows with the number of rows and
+    the nodes a search actually explores rather than with the area of the maze.
+
+    Supports the same interface the solvers use on the adjacency list returned by buildAdjacencyList, including the
+    derived dictionary the solvers keep what they build from the graph in (see adjacency.getDerived).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._file = open(name, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._count = None
+        self.derived = {}
+
+        # Find the start and length of every row once
+        self.starts = array("q")
+        self.lengths = array("q")
+        mm = self._mm
+        size = len(mm)
+        position = 0
+        while position < size:
+            end = mm.find(b"\n", position)
+            if end == -1:
+                end = size
+            length = end - position
+            # Ignore the carriage return of Windows line endings
+            if length and mm[end - 1] == ord("\r"):
+                length -= 1
+            self.starts.append(position)
+            self.lengths.append(length)
+            position = end + 1
+
+        # Drop trailing blank rows and trailing whitespace, as readMazeFile strips them
+        while self.lengths and not self.row(len(self.lengths) - 1).strip():
+            self.starts.pop()
+            self.lengths.pop()
+        if self.lengths:
+            self.lengths[-1] = len(self.row(len(self.lengths) - 1).rstrip())
+
+        self.height = len(self.lengths)
+        self.width = max(self.lengths, default=0)
+
+    def row(self, y: int) -> bytes:
+        """
+        Returns the raw bytes of row y.
+        """
+        start = self.starts[y]
+        return self._mm[start:start + self.lengths[y]]
+
+    def isOpen(self, x: int, y: int) -> bool:
+        """
+        Returns whether the cell at (x, y) is an open cell, treating anything outside the maze as a wall.
+        """
+        return 0 <= y < self.height and 0 <= x < self.lengths[y] and self._mm[self.starts[y] + x] == OPEN
+
+    def __getitem__(self, node: Tuple[int, int]) -> List[Tuple[int, int]]:
+        # Compute the neighbours in the same order as returnNeighbours (up, down, right, left)
+        x, y = node
+        if not self.isOpen(x, y):
+            return []
+        return [n for n in ((x, y - 1), (x, y + 1), (x + 2, y), (x - 2, y)) if self.isOpen(*n)]
+
+    def __contains__(self, node: Tuple[int, int]) -> bool:
+        return node[0] % 2 == 0 and self.isOpen(*node)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        # Yield the open cells in row-major order, reading one row at a time
+        for y in range(self.height):
+            row = self.row(y)
+            x = row.find(b"-")
+            while x != -1:
+                if x % 2 == 0:
+                    yield x, y
+                x = row.find(b"-", x + 1)
+
+    def __reversed__(self) -> Iterator[Tuple[int, int]]:
+        for y in reversed(range(self.height)):
+            row = self.row(y)
+            x = row.rfind(b"-")
+            while x != -1:
+                if x % 2 == 0:
+                    yield x, y
+                x = row.rfind(b"-", 0, x)
+
+    def __len__(self) -> int:
+        # Counting the nodes needs a full pass over the file, so it is only done when asked for and then cached
+        if self._count is None:
+            self._count = sum(self.row(y)[::2].count(b"-") for y in range(self.height))
+        return self._count
+
+    def keys(self) -> "LazyMazeGraph":
+        return self
+
+    def copy(self) -> "LazyMazeGraph":
+        # The graph is read-only, so there is nothing to copy
+        return self
+
+    def writeSolution(self, fileName: str, solution: List[Tuple[int, int]]) -> None:
+        """
+        Writes the maze with the solution path marked with an 'X', streaming one row at a time from the mapped file.
+
+        Args:
+            fileName (str): The name of the file to write.
+            solution (list): A list of tuples representing the nodes in the solution path.
+        """
+        # Group the path cells by row
+        marks: Dict[int, List[int]] = {}
+        for x, y in solution:
+            marks.setdefault(y, []).append(x)
+
+        with open(fileName, "wb") as file:
+            for y in range(self.height):
+                row = self.row(y)
+                if y in marks:
+                    row = bytearray(row)
+                    for x in marks[y]:
+                        row[x] = ord("X")
+                file.write(row)
+                file.write(b"\n")
+
+    def close(self) -> None:
+        """
+        Unmaps the maze file and closes it, forgetting everything the solvers built from the graph.
+        """
+        self.derived.clear()
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> "LazyMazeGraph":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -1,17 +1,68 @@
-import math
+import argparse
+import glob
+import json
 import os
+import sys
 import time
-from astar import aStarSolver
-from dfs import depthFirstSearch
-from typing import Dict, List, Tuple
-from queue import PriorityQueue
-from collections import deque, defaultdict
-from rich.table import Table
-from rich.console import Console
-from rich.progress import track
+from array import array
+from astar import aStarSolver, aStarSolverBucket, aStarSolverBucketCSR, aStarSolverCSR
+from dfs import depthFirstSearch, depthFirstSearchCSR
+from bidirectional import bidirectionalAStar, bidirectionalBFS
+from contraction import contractedAStarSolver, contractedDepthFirstSearch, loadContractedGraph
+from jps import jumpPointSearch
+from bitbfs import bitParallelBFS
+from incremental import lifelongPlanningAStar
+from landmarks import aStarLandmarks, loadLandmarks
+from hierarchy import hierarchicalAStar
+from components import mayBeConnected
+from csrgraph import CSRGraph, buildCSRGraph
+from graphcache import loadCachedGraph
+from lazymaze import LazyMazeGraph
+from instrumentation import SearchMetrics
+from pathformat import writeCompactSolution
+from adjacency import AdjacencyList, forgetDerived
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Tuple
+
+# rich is only imported once something is printed, so scripts which only solve mazes start quickly
+if TYPE_CHECKING:
+    from rich.table import Table
+
+# Algorithms understood by solveMaze and the graph backends understood by buildGraph
+ALGORITHMS = ("DFS", "ASTAR", "ASTAR-BUCKET", "ASTAR-ALT", "BIASTAR", "BIBFS", "ASTAR-CONTRACTED", "DFS-CONTRACTED", "JPS", "BITBFS", "LPASTAR", "HPASTAR")
+BACKENDS = ("dict", "csr", "numpy", "mmap", "cache")
+
+
+class LazyConsole:
+    """
+    Stands in for a rich Console, creating the real console with the given options the first time it is used.
+    """
+
+    def __init__(self, **options):
+        self.options = options
+        self._console = None
+
+    def __getattr__(self, name: str):
+        if self._console is None:
+            from rich.console import Console
+            self._console = Console(**self.options)
+        return getattr(self._console, name)
+
+
+c = LazyConsole()
+
+
+def findMazeFiles(directory: str = ".") -> List[str]:
+    """
+    Returns the maze files in a directory, excluding solution files.
 
+    Args:
+        directory (str): The directory to search. Defaults to the current directory.
 
-c = Console()
+    Returns:
+        list[str]: The names of the maze files.
+    """
+    return [x for x in os.listdir(directory) if ("maze" in x and "Solution" not in x and not x.endswith(".py")
+                                                and os.path.isfile(os.path.join(directory, x)))]
 
 
 def readMazeFile(name: str) -> list:
@@ -36,6 +87,27 @@ def readMazeFile(name: str) -> list:
         return maze_list
 
 
+def readMaze(name: str, backend: str = "dict"):
+    """
+    Reads in a maze file in the form needed by the given graph backend.
+
+    Args:
+        name (str): The filename of the maze file.
+        backend (str): The graph backend the maze will be built with.
+
+    Returns:
+        The list of strings returned by readMazeFile, the 2D character array returned by npmaze.readMazeArray for the
+        "numpy" backend, or a LazyMazeGraph over the memory-mapped file for the "mmap" and "cache" backends.
+    """
+    if backend in ("mmap", "cache"):
+        return LazyMazeGraph(name)
+    if backend == "numpy":
+        # NumPy is only needed for this backend, so it is imported on demand
+        from npmaze import readMazeArray
+        return readMazeArray(name)
+    return readMazeFile(name)
+
+
 def returnNeighbours(maze: List[List[str]], x: int, y: int) -> List[Tuple[int, int]]:
     """
     Returns the coordinates of all the neighboring nodes that are valid paths (represented by a `-` character).
@@ -75,7 +147,7 @@ def returnNeighbours(maze: List[List[str]], x: int, y: int) -> List[Tuple[int, i
     return neighbours
 
 
-def buildAdjacencyList(maze: List[List[str]]) -> defaultdict:
+def buildAdjacencyList(maze: List[List[str]]) -> AdjacencyList:
     """
     Build an adjacency list representation of the given maze.
     
@@ -83,11 +155,12 @@ def buildAdjacencyList(maze: List[List[str]]) -> defaultdict:
         maze (list of lists): A 2D grid representation of the maze, where "-" represents a node and " " represents an edge
     
     Returns:
-        adjacencyList (defaultdict): A defaultdict where each key is a tuple representing a node in the maze, and the value is a list of its neighbours
+        adjacencyList (AdjacencyList): A defaultdict where each key is a tuple representing a node in the maze, and the value is a list of its neighbours
     """
     bounds = (0, len(maze), 0, len(maze[0])) # set the bounds of the maze as a tuple
     
-    adjacencyList = defaultdict(list) # initialize an empty defaultdict to store the adjacency list representation of the maze
+    adjacencyList = AdjacencyList(list) # initialize an empty defaultdict to store the adjacency list representation of the maze
+    adjacencyList.width, adjacencyList.height = max(len(row) for row in maze), len(maze) # keep the size of the maze for the component index
     
     for y in range(bounds[1]): # loop through all rows in the maze
         for x in range(0, bounds[3], 2): # loop through every other column in the maze
@@ -97,6 +170,55 @@ def buildAdjacencyList(maze: List[List[str]]) -> defaultdict:
     return adjacencyList
 
 
+def buildGraph(maze: List[str], backend: str = "dict"):
+    """
+    Build the graph representation of the maze using the requested backend.
+
+    Args:
+        maze: The maze as returned by readMaze for the same backend.
+        backend (str): "dict" for the defaultdict adjacency list, "csr" for the compact CSRGraph or "numpy" for a
+          CSRGraph built by the vectorized NumPy parser, "mmap" for the LazyMazeGraph returned by readMaze, or
+          "cache" for a CSRGraph mapped from the binary graph cache of the maze file.
+
+    Returns:
+        The graph, which supports len(), iteration over nodes and neighbour lookup by node.
+
+    Raises:
+        ValueError: If the specified backend is not valid.
+    """
+    if backend == "dict":
+        return buildAdjacencyList(maze)
+    elif backend == "csr":
+        return buildCSRGraph(maze)
+    elif backend == "numpy":
+        # The maze is already the character array read by readMaze
+        from npmaze import buildCSRGraphFromArray
+        return buildCSRGraphFromArray(maze)
+    elif backend == "mmap":
+        # The memory-mapped maze already computes neighbours on demand
+        return maze
+    elif backend == "cache":
+        # The graph is loaded from the cache built on the first run, the memory-mapped maze is only kept for saving
+        # solutions and for jump point search
+        return loadCachedGraph(maze.name)
+    else:
+        raise ValueError(f"Invalid graph backend '{backend}'")
+
+
+def findEndpoints(adjacencyList) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """
+    Returns the root and goal nodes of a maze, which are the first and last nodes of its graph.
+
+    Args:
+        adjacencyList: The graph representation of the maze.
+
+    Returns:
+        Tuple[Tuple[int, int], Tuple[int, int]]: The root and goal nodes.
+    """
+    keys = adjacencyList.keys()
+    return next(iter(keys)), next(reversed(keys))
+
+
 def backtrackSolution(solutionMap: dict, root: Tuple, goal: Tuple) -> list:
     """
     Trace the solution path from the goal to the root node using the provided solution map.
@@ -128,58 +250,92 @@ def backtrackSolution(solutionMap: dict, root: Tuple, goal: Tuple) -> list:
     return set(path)
 
 
-def saveSolution(mazeFileName: str, maze: list, solution: list, algorithm: str) -> None:
+def saveSolution(mazeFileName: str, maze: list, solution: list, algorithm: str, compact: bool = False) -> str:
     """
     Takes a maze file name, the maze itself, the solution path, and the algorithm used to find the solution.
-    Modifies the maze by replacing the characters on the solution path with an 'X' and saves the modified maze 
-    as a new file with the original maze file name, algorithm used, and "-Solution" appended to the file name.
+    Marks the characters on the solution path with an 'X' and saves the marked maze as a new file with the original
+    maze file name, algorithm used, and "-Solution" appended to the file name.
 
     Args:
         mazeFileName (str): The name of the original maze file.
-        maze (list): A list of strings representing the maze.
+        maze (list): A list of strings representing the maze, or the maze as returned by readMaze for any backend. It
+          is not modified.
         solution (list): A list of tuples representing the nodes in the solution path.
         algorithm (str): A string representing the algorithm used to find the solution.
+        compact (bool, optional): Save only the path, as its start cell and run-length encoded moves, in a ".path"
+          file instead of the marked maze (see pathformat.py). The solution must then be ordered from start to end.
 
     Returns:
-        bool: if the function completes its execution
-
-    Raises:
-        Raises an exception if the file can't be saved
+        str: The name of the solution file, or None if it could not be saved.
     """
 
-    # Initialize an empty string to hold the output
-    outputString = ''
-
-    # For each node in the solution path
-    for node in solution:
-        # Get the x and y coordinates of the node
-        x, y = node
-        # Replace the character at that position in the maze with an 'X'
-        maze[y] = maze[y][:x] + "X" + maze[y][x + 1:]
-
-    # For each line in the modified maze
-    for line in maze:
-        # Append the line to the output string with a newline character
-        outputString += line + "\n"
-
     directory = "solutions/"
 
     if not os.path.exists(directory):
         os.makedirs(directory)
 
+    # Name the file after the original maze file name, the name of the algorithm used, and the string "-Solution"
+    fileName = f"{directory}{mazeFileName.split('.')[0]}-{algorithm}-Solution"
+
+    # The compact format holds just the path, however large the maze is
+    if compact:
+        fileName += ".path"
+        try:
+            writeCompactSolution(fileName, solution)
+        except Exception as e:
+            c.print(f"\n[*] Error in saving file, {e}")
+            return None
+        return fileName
+    fileName += ".txt"
+
+    # Memory-mapped mazes are streamed row by row from the mapped file instead of being loaded into memory
+    if isinstance(maze, LazyMazeGraph):
+        try:
+            maze.writeSolution(fileName, solution)
+        except Exception as e:
+            c.print(f"\n[*] Error in saving file, {e}")
+            return None
+        return fileName
+
+    # The character array of the NumPy backend is marked on a copy
+    if hasattr(maze, "shape"):
+        from npmaze import markSolutionArray
+        try:
+            with open(fileName, "wb") as file:
+                file.write(markSolutionArray(maze, solution))
+        except Exception as e:
+            c.print(f"\n[*] Error in saving file, {e}")
+            return None
+        return fileName
+
+    # Lay the whole maze out in one buffer, one byte per character and a newline after every row, and note where
+    # each row starts
+    buffer = bytearray("\n".join(maze).encode("latin-1") + b"\n")
+    rowStarts = [0] * len(maze)
+    position = 0
+    for y, line in enumerate(maze):
+        rowStarts[y] = position
+        position += len(line) + 1
+
+    # Mark every node on the solution path with an 'X' in place
+    mark = ord("X")
+    for x, y in solution:
+        buffer[rowStarts[y] + x] = mark
+
     try:
-        # Open a file with a name that includes the original maze file name, the name of the algorithm used, and the string "-Solution" 
-        with open(f"{directory}{mazeFileName.split('.')[0]}-{algorithm}-Solution.txt", "w") as file:
-            # Write the output string to the file
-            file.write(outputString)
+        # Write the marked maze to the solution file in one go
+        with open(fileName, "wb") as file:
+            file.write(buffer)
     except Exception as e:
         c.print(f"\n[*] Error in saving file, {e}")
+        return None
 
 
-    return True
+    return fileName
 
 
-def statsTable(algorithm: str, explored: int, adjacencyList: list, path: list, start: float, end: float) -> Table:
+def statsTable(algorithm: str, explored: int, adjacencyList: list, path: list, start: float, end: float,
+               metrics: SearchMetrics = None) -> "Table":
     """
     Creates a table of statistics for a given algorithm run on a maze.
 
@@ -190,10 +346,12 @@ def statsTable(algorithm: str, explored: int, adjacencyList: list, path: list, s
         path (list): The solution path obtained by the algorithm.
         start (float): The start time of the algorithm.
         end (float): The end time of the algorithm.
+        metrics (SearchMetrics, optional): Search metrics collected during the run, added as extra rows if given.
 
     Returns:
         Table: A rich Table object containing the statistics of the algorithm execution.
     """
+    from rich.table import Table
 
     # Create a new table object with the title being the name of the algorithm
     table = Table(title=f"Statistics for {algorithm}")
@@ -209,12 +367,177 @@ def statsTable(algorithm: str, explored: int, adjacencyList: list, path: list, s
     table.add_row("Time taken to solve the maze", f"{round(end-start, 7)} seconds")
     table.add_row("Solution percentage", f"[green]{int(len(path)/len(adjacencyList) * 100)}%")
 
+    # Add rows for the search metrics, if they were collected
+    if metrics is not None:
+        for statistic, value in metrics.rows():
+            table.add_row(statistic, value)
+
     # Return the table object
     return table
 
 
+def timingTable(runs: int, times: Dict[str, List[float]]) -> "Table":
+    """
+    Creates a table of the average, minimum and maximum time taken by each algorithm over a number of runs.
+
+    Parameters:
+        runs (int): The number of runs the times were collected over.
+        times (Dict[str, List[float]]): The time taken by each run, in seconds, keyed by the name of the algorithm.
+
+    Returns:
+        Table: A rich Table object containing the time statistics.
+    """
+    from rich.table import Table
+
+    # Create a table for the averaged times
+    table = Table(title=f"Time statistics over {runs} runs")
+
+    # Add columns to the table
+    table.add_column("[bold]Algorithm")
+    table.add_column("[bold]Average time")
+    table.add_column("[bold]Minimum time")
+    table.add_column("[bold]Maximum time")
+
+    # Add the various statistics (algorithm, average time, minimum time, maximum time)
+    for algorithm, values in times.items():
+        table.add_row(algorithm, str(round(sum(values)/len(values), 7)), str(round(min(values),7)), str(round(max(values),7)))
+
+    return table
+
+
+def selectSolver(adjacencyList, root: Tuple[int, int], goal: Tuple[int, int], algorithmType: str,
+                 maze: List[str] = None) -> Tuple[Callable, Any, Any]:
+    """
+    Picks the solver function for the given algorithm and graph, along with the root and goal in the form it expects.
+
+    Args:
+        adjacencyList: The graph representation of the maze.
+        root (Tuple[int, int]): The starting node for the maze.
+        goal (Tuple[int, int]): The goal node for the maze.
+        algorithmType (str): The type of algorithm to use. Must be one of ALGORITHMS.
+        maze (list[str], optional): The maze as returned by readMaze, needed by the algorithms that search the grid
+          directly instead of the graph.
+
+    Returns:
+        Tuple[Callable, Any, Any]: The solver function, and the root and goal to pass to it.
+
+    Raises:
+        ValueError: If the specified algorithm type is not valid.
+    """
+    # CSR graphs are searched by node id using the flat array solvers.
+    csr = isinstance(adjacencyList, CSRGraph)
+
+    # Determine which algorithm to use.
+    if algorithmType == "DFS":
+        solveFunc = depthFirstSearchCSR if csr else depthFirstSearch
+    elif algorithmType == "ASTAR":
+        solveFunc = aStarSolverCSR if csr else aStarSolver
+    elif algorithmType == "ASTAR-BUCKET":
+        solveFunc = aStarSolverBucketCSR if csr else aStarSolverBucket
+    elif algorithmType == "ASTAR-ALT":
+        solveFunc = aStarLandmarks
+    elif algorithmType == "BIASTAR":
+        solveFunc = bidirectionalAStar
+    elif algorithmType == "BIBFS":
+        solveFunc = bidirectionalBFS
+    elif algorithmType == "ASTAR-CONTRACTED":
+        solveFunc = contractedAStarSolver
+    elif algorithmType == "DFS-CONTRACTED":
+        solveFunc = contractedDepthFirstSearch
+    elif algorithmType == "JPS":
+        # Jump point search works on the grid rather than the graph, graphs which can say whether a cell is open
+        # (CSRGraph and LazyMazeGraph) can stand in for it, and do for the character array of the NumPy backend
+        grid = maze if isinstance(maze, (list, LazyMazeGraph)) else adjacencyList if hasattr(adjacencyList, "isOpen") else None
+        if grid is None:
+            raise ValueError("Jump point search needs the maze grid")
+        solveFunc = lambda adjacencyList, root, goal: jumpPointSearch(grid, root, goal)
+    elif algorithmType == "BITBFS":
+        # The bit-parallel search packs the grid into a bitset, CSRGraph and LazyMazeGraph can also be packed
+        grid = maze if isinstance(maze, (list, LazyMazeGraph)) else adjacencyList if hasattr(adjacencyList, "isOpen") else None
+        if grid is None:
+            raise ValueError("Bit-parallel BFS needs the maze grid")
+        solveFunc = lambda adjacencyList, root, goal: bitParallelBFS(grid, root, goal, adjacencyList)
+    elif algorithmType == "LPASTAR":
+        solveFunc = lifelongPlanningAStar
+    elif algorithmType == "HPASTAR":
+        solveFunc = hierarchicalAStar
+    else:
+        raise ValueError(f"Invalid algorithm type '{algorithmType}'")
+
+    # Only the flat array solvers search by node id, the others use the coordinate interface of the graph
+    if solveFunc in (depthFirstSearchCSR, aStarSolverCSR, aStarSolverBucketCSR):
+        return solveFunc, adjacencyList.nodeId(root), adjacencyList.nodeId(goal)
+    return solveFunc, root, goal
+
+
+def loadDerived(adjacencyList, mazeFileName: str, algorithmType: str) -> None:
+    """
+    Loads what an algorithm builds from the graph before searching it from the cache directory, building and caching
+    it there the first time: the landmark tables of ASTAR-ALT and the contracted graph of the contracted algorithms.
+    Whatever is loaded is kept on the graph for the solver to use, and anything the graph already holds is left as it
+    is. Only call this while the graph still matches the maze file; nothing is loaded if there is no such file.
+
+    Args:
+        adjacencyList: The graph built from the maze file.
+        mazeFileName (str): The name of the maze file.
+        algorithmType (str): The algorithm about to be run. Must be one of ALGORITHMS.
+    """
+    derived = getattr(adjacencyList, "derived", None)
+    if derived is None or not os.path.isfile(mazeFileName):
+        return
+    if algorithmType == "ASTAR-ALT" and "landmarks" not in derived:
+        loadLandmarks(mazeFileName, adjacencyList)
+    elif algorithmType.endswith("-CONTRACTED") and "contracted" not in derived:
+        loadContractedGraph(mazeFileName, adjacencyList)
+
+
+def buildPath(adjacencyList, solutionMap, searchRoot, searchGoal) -> set:
+    """
+    Backtracks the solution map returned by a solver from selectSolver into the set of coordinates on the path.
+
+    Args:
+        adjacencyList: The graph representation of the maze.
+        solutionMap: The parent map (or parent array for the flat array solvers) returned by the solver.
+        searchRoot: The root passed to the solver.
+        searchGoal: The goal passed to the solver.
+
+    Returns:
+        set: The coordinates of the nodes on the solution path.
+    """
+    path = backtrackSolution(solutionMap, searchRoot, searchGoal)
+    if isinstance(solutionMap, array):
+        # Convert the node ids on the path from a flat array solver back into coordinates
+        path = {adjacencyList.coordinate(i) for i in path}
+    return path
+
+
+def tracePath(adjacencyList, solutionMap, searchRoot, searchGoal) -> List[Tuple[int, int]]:
+    """
+    Backtracks the solution map returned by a solver from selectSolver into the ordered list of coordinates on the
+    path, as needed by the compact solution format.
+
+    Args:
+        adjacencyList: The graph representation of the maze.
+        solutionMap: The parent map (or parent array for the flat array solvers) returned by the solver.
+        searchRoot: The root passed to the solver.
+        searchGoal: The goal passed to the solver.
+
+    Returns:
+        list: The coordinates of the nodes on the solution path, from the root to the goal.
+    """
+    path = [searchGoal]
+    while path[-1] != searchRoot:
+        path.append(solutionMap[path[-1]])
+    path.reverse()
+    if isinstance(solutionMap, array):
+        # Convert the node ids on the path from a flat array solver back into coordinates
+        path = [adjacencyList.coordinate(i) for i in path]
+    return path
+
+
 def solveMaze(adjacencyList: Dict[int, List[Tuple[int, int]]], root: int, goal: int,
-              mazeFileName: str, algorithmType: str, print: bool = True) -> Tuple[float, str]:
+              mazeFileName: str, algorithmType: str, print: bool = True, maze: List[str] = None,
+              metrics: SearchMetrics = None, compact: bool = False) -> Tuple[float, str]:
     """
     Solves a maze using the specified algorithm and prints/saves the solution if needed.
 
@@ -224,8 +547,18 @@ def solveMaze(adjacencyList: Dict[int, List[Tuple[int, int]]], root: int, goal:
         root (int): The starting node for the maze.
         goal (int): The goal node for the maze.
         mazeFileName (str): The name of the maze file.
-        algorithmType (str): The type of algorithm to use. Must be either "DFS" or "ASTAR".
+        algorithmType (str): The type of algorithm to use. Must be one of ALGORITHMS.
         print (bool, optional): Whether to print the solution or not. Default is True.
+        maze (list[str], optional): The maze as returned by readMaze, used to save the solution and by the
+          algorithms that search the grid. Defaults to the maze read in when run as a script.
+        metrics (SearchMetrics, optional): If given, the search, backtrack and save phases are timed into it, and
+          the DFS and ASTAR solvers count their frontier operations into it.
+        compact (bool, optional): Whether to save the solution in the compact path format instead of as a marked
+          maze. Default is False.
+
+    The component index of the graph is checked first (labelled on the first solve of the graph and kept on it), so
+    when the root and goal are not connected no solver is run and the result reports no nodes explored and an empty
+    solution.
 
     Returns:
         Tuple[float, str]: A tuple containing the time taken to solve the maze and the statistics table for the solution.
@@ -234,38 +567,57 @@ def solveMaze(adjacencyList: Dict[int, List[Tuple[int, int]]], root: int, goal:
         ValueError: If the specified algorithm type is not valid.
     """
 
-    # Determine which algorithm to use.
-    if algorithmType == "DFS":
-        solveFunc = depthFirstSearch
-    elif algorithmType == "ASTAR":
-        solveFunc = aStarSolver
-    else:
-        raise ValueError(f"Invalid algorithm type '{algorithmType}'")
+    if maze is None:
+        maze = mazeFile
+
+    solveFunc, searchRoot, searchGoal = selectSolver(adjacencyList, root, goal, algorithmType, maze)
+    loadDerived(adjacencyList, mazeFileName, algorithmType)
 
     # Solve the maze using the specified algorithm.
     if print:
         c.print(f"\n[*] {algorithmType} Solving started...")
 
+    # The components are labelled on the first check of a graph, before the timer starts like the derived structures
+    connected = mayBeConnected(adjacencyList, root, goal)
+
     start = time.time()
-    solutionMap, explored = solveFunc(adjacencyList, root, goal)
+    if not connected:
+        # The root and goal are in different components, so there is no need to search
+        solutionMap, explored = None, 0
+    elif metrics is None:
+        solutionMap, explored = solveFunc(adjacencyList, searchRoot, searchGoal)
+    else:
+        # Only the dictionary based solvers count frontier operations, the rest are just timed
+        with metrics.phase("search"), metrics.memory():
+            if solveFunc in (aStarSolver, aStarSolverBucket, depthFirstSearch):
+                solutionMap, explored = solveFunc(adjacencyList, searchRoot, searchGoal, metrics)
+            else:
+                solutionMap, explored = solveFunc(adjacencyList, searchRoot, searchGoal)
     if solutionMap is not None:
         if print:
             c.print(f"[*] [green]Solution found, [white]time taken: [cyan]{round(time.time() - start, 5)}\n")
         backtrackTime = time.time()
         if print:
             c.print("[*] Constructing solution from map...")
-        path = backtrackSolution(solutionMap, root, goal)
+        if compact:
+            # The compact format needs the path in order, the set is still used for the statistics
+            orderedPath = tracePath(adjacencyList, solutionMap, searchRoot, searchGoal)
+            path = set(orderedPath)
+        else:
+            path = buildPath(adjacencyList, solutionMap, searchRoot, searchGoal)
+        if metrics is not None:
+            metrics.phases["backtrack"] = time.time() - backtrackTime
         if print:
             c.print(f"[*] Solution constructed, time taken: {round(time.time() - backtrackTime, 5)}\n")
         end = time.time()
 
-        # Print statistics table for solution.
-        if print:
-            c.print(statsTable(f"{algorithmType} on {mazeFileName}", explored, adjacencyList, path, start, end))
         # Save solution to file.
         if print:
             c.print("[*] Saving solution...")
-        saved = saveSolution(mazeFileName, mazeFile.copy(), path, algorithmType)
+        saveTime = time.time()
+        saved = saveSolution(mazeFileName, maze, orderedPath if compact else path, algorithmType, compact)
+        if metrics is not None:
+            metrics.phases["save"] = time.time() - saveTime
         if print:
             if saved:
                 c.print(f"[*] {algorithmType} Solution saved in [purple]/solutions/[white] directory")
@@ -274,14 +626,171 @@ def solveMaze(adjacencyList: Dict[int, List[Tuple[int, int]]], root: int, goal:
 
     else:
         # If no solution is found.
-        c.print(f"[*] [red]No solution possible[white], {explored} nodes explored, {round(time.time() - start, 5)} seconds taken")
-    return end - start, statsTable(f"{algorithmType} on {mazeFileName}", explored, adjacencyList, path, start, end)
+        path = set()
+        end = time.time()
+        if print:
+            c.print(f"[*] [red]No solution possible[white], {explored} nodes explored, {round(end - start, 5)} seconds taken")
+
+    # Build the statistics table once the solution is saved, so it can show the time taken to save it.
+    table = statsTable(f"{algorithmType} on {mazeFileName}", explored, adjacencyList, path, start, end, metrics)
+    if print and solutionMap is not None:
+        c.print(table)
+    return end - start, table
+
+
+
+def expandMazePaths(patterns: List[str]) -> List[str]:
+    """
+    Expands maze file names and glob patterns into the list of maze files they name, in order and without
+    duplicates. A pattern which is not a glob, or which matches nothing, is kept as it is so the error is reported
+    for it.
+
+    Args:
+        patterns (list[str]): The maze file names and glob patterns.
+
+    Returns:
+        list[str]: The maze files.
+    """
+    mazeFiles = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else []
+        mazeFiles.extend(matches or [pattern])
+    return list(dict.fromkeys(mazeFiles))
+
 
+def batchRecords(mazeFiles: List[str], algorithms: List[str], backend: str = "dict", runs: int = 1,
+                 save: bool = True, compact: bool = False) -> Iterator[dict]:
+    """
+    Solves every maze with every algorithm without any prompts or printing, yielding one result record per maze and
+    algorithm as soon as it is ready.
+
+    Args:
+        mazeFiles (list[str]): The maze files to solve.
+        algorithms (list[str]): The algorithms to run.
+        backend (str): The graph backend to build the mazes with.
+        runs (int): The number of times each algorithm is run, the record holds the mean, minimum and maximum time.
+        save (bool): Whether to save the solution of the last run with saveSolution.
+        compact (bool): Whether to save solutions in the compact path format.
+
+    Yields:
+        dict: The result record of each maze and algorithm. A maze which cannot be read or solved yields a record
+        holding an "error" message instead, and the batch carries on.
+    """
+    for mazeFileName in mazeFiles:
+        maze = adjacencyList = None
+        try:
+            try:
+                loadStart = time.perf_counter()
+                maze = readMaze(mazeFileName, backend)
+                parsed = time.perf_counter()
+                adjacencyList = buildGraph(maze, backend)
+                built = time.perf_counter()
+                root, goal = findEndpoints(adjacencyList)
+            except Exception as e:
+                yield {"maze": mazeFileName, "error": str(e)}
+                continue
+
+            for algorithmType in algorithms:
+                record = {"maze": mazeFileName, "algorithm": algorithmType, "backend": backend}
+                try:
+                    solveFunc, searchRoot, searchGoal = selectSolver(adjacencyList, root, goal, algorithmType, maze)
+                    loadDerived(adjacencyList, mazeFileName, algorithmType)
+                    connected = mayBeConnected(adjacencyList, root, goal)
+                    times = []
+                    for _ in range(runs):
+                        start = time.perf_counter()
+                        if connected:
+                            solutionMap, explored = solveFunc(adjacencyList, searchRoot, searchGoal)
+                        else:
+                            solutionMap, explored = None, 0
+                        if solutionMap is not None:
+                            path = tracePath(adjacencyList, solutionMap, searchRoot, searchGoal)
+                        times.append(time.perf_counter() - start)
+
+                    solved = solutionMap is not None
+                    record.update({
+                        "nodes": len(adjacencyList),
+                        "nodesExplored": explored,
+                        "solved": solved,
+                        "solutionLength": len(path) if solved else None,
+                        "runs": runs,
+                        "parseTime": parsed - loadStart,
+                        "buildTime": built - parsed,
+                        "meanTime": sum(times) / len(times),
+                        "minTime": min(times),
+                        "maxTime": max(times),
+                        "saved": None,
+                    })
+                    if save and solved:
+                        # Solutions are named after the maze file alone, wherever the maze file is
+                        record["saved"] = saveSolution(os.path.basename(mazeFileName), maze, path if compact else set(path),
+                                                       algorithmType, compact)
+                except Exception as e:
+                    record["error"] = str(e)
+                yield record
+        finally:
+            # Release everything built for this maze before moving on to the next one: the structures the solvers
+            # kept on the graph, and the mapped file of the mmap and cache backends
+            if adjacencyList is not None:
+                forgetDerived(adjacencyList)
+            if hasattr(maze, "close"):
+                maze.close()
+
+
+def parseArguments(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Solve maze files without any prompts, writing one JSON result per line.",
+                                     epilog="Run without any arguments to choose a maze and options interactively.")
+    parser.add_argument("mazes", nargs="+", help="maze files or glob patterns, such as 'mazes/*.txt'")
+    parser.add_argument("-a", "--algorithms", nargs="+", default=["DFS", "ASTAR"], choices=ALGORITHMS)
+    parser.add_argument("-b", "--backend", default="dict", choices=BACKENDS)
+    parser.add_argument("-r", "--runs", type=int, default=1, help="number of runs of each algorithm on each maze (default: 1)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not save solution files")
+    parser.add_argument("--compact", action="store_true", help="save solutions in the compact path format")
+    parser.add_argument("--pretty", action="store_true", help="print statistics tables instead of JSON Lines")
+    return parser.parse_args(argv)
+
+
+def batchMain(argv: List[str] = None) -> int:
+    """
+    Runs the headless command line mode, streaming a JSON Lines record (or a statistics table with --pretty) for
+    every maze and algorithm.
+
+    Returns:
+        int: The exit status, 1 if any maze could not be solved because of an error.
+    """
+    args = parseArguments(argv)
+    if args.runs < 1:
+        sys.exit("main.py: error: --runs must be at least 1")
+
+    # Keep stdout for the records, anything else printed goes to stderr
+    if not args.pretty:
+        c.options["stderr"] = True
+
+    status = 0
+    records = batchRecords(expandMazePaths(args.mazes), args.algorithms, args.backend, args.runs,
+                           save=not args.quiet, compact=args.compact)
+    for record in records:
+        if "error" in record:
+            status = 1
+        if not args.pretty:
+            sys.stdout.write(json.dumps(record) + "\n")
+            sys.stdout.flush()
+        elif "error" in record:
+            c.print(f"[*] [red]{record['maze']} {record.get('algorithm', '')}[white]: {record['error']}")
+        else:
+            # statsTable only needs the sizes of the graph and the path
+            c.print(statsTable(f"{record['algorithm']} on {record['maze']}", record["nodesExplored"], range(record["nodes"]),
+                               range(record["solutionLength"] or 0), 0, record["meanTime"]))
+    return status
 
 
 if __name__ == "__main__":
+    # Run headless when given any arguments
+    if len(sys.argv) > 1:
+        sys.exit(batchMain())
+
     # Create a list of maze files in the current directory, exclude solution files.
-    availableMazeFiles = [x for x in os.listdir() if ("maze" in x and "Solution" not in x)]
+    availableMazeFiles = findMazeFiles()
 
     # Print the available files and allow user to select a maze file.
     c.print("[*] Available files:")
@@ -304,23 +813,45 @@ if __name__ == "__main__":
         runs = int(c.input("\n[*] Amount of runs: "))
 
 
+    # Prompt the user for the graph representation to use
+    backend = c.input("\n[*] Graph backend? (dict/csr/numpy/mmap/cache) ").lower() or "dict"
+
+
+    # Prompt the user for whether to collect search metrics (frontier counters, phase times, peak memory)
+    instrument = c.input("\n[*] Collect search metrics? (y/n) ").lower() == "y"
+
+    # Prompt the user for whether to save just the path (start cell and run-length encoded moves) instead of the maze
+    compact = c.input("\n[*] Save solutions in the compact path format? (y/n) ").lower() == "y"
+
+
     # Read maze file into memory and build adjacency list.
     c.print("\n[*] Reading file into memory...")
     start = time.time()
-    mazeFile = readMazeFile(mazeFileName)
-    c.print(f"[*] File read into memory, time taken: {round(time.time() - start, 5)} seconds\n")
+    mazeFile = readMaze(mazeFileName, backend)
+    parseTime = time.time() - start
+    c.print(f"[*] File read into memory, time taken: {round(parseTime, 5)} seconds\n")
 
 
     # Make adjacency list
     c.print("[*] Constructing adjacency list...")
     start = time.time()
-    adjacencyList = buildAdjacencyList(mazeFile)
-    c.print(f"[*] Adjacency list built, time taken: {round(time.time() - start, 5)} seconds\n")
+    adjacencyList = buildGraph(mazeFile, backend)
+    buildTime = time.time() - start
+    c.print(f"[*] Adjacency list built, time taken: {round(buildTime, 5)} seconds\n")
 
 
     # Get the root and goal nodes for the maze (first and last nodes in adjacencyList)
-    root = list(adjacencyList.keys())[0]
-    goal = list(adjacencyList.keys())[-1]
+    root, goal = findEndpoints(adjacencyList)
+
+
+    def newMetrics():
+        # Fresh metrics for a single solve, starting with the shared parse and build times
+        if not instrument:
+            return None
+        metrics = SearchMetrics(traceMemory=True)
+        metrics.phases["parse"] = parseTime
+        metrics.phases["build"] = buildTime
+        return metrics
 
 
     # Solve maze using the two algorithms
@@ -333,26 +864,18 @@ if __name__ == "__main__":
         DFSstats = None
         ASTARstats = None
 
+        from rich.progress import track
+
         # Run the algorithms
         for i in track(range(runs), description="[*] Solving mazes..."):
-            DFStime, DFSstats = (solveMaze(adjacencyList, root, goal, mazeFileName, "DFS", False))
-            ASTARtime, ASTARstats = (solveMaze(adjacencyList, root, goal, mazeFileName, "ASTAR", False))
+            DFStime, DFSstats = (solveMaze(adjacencyList, root, goal, mazeFileName, "DFS", False, metrics=newMetrics(), compact=compact))
+            ASTARtime, ASTARstats = (solveMaze(adjacencyList, root, goal, mazeFileName, "ASTAR", False, metrics=newMetrics(), compact=compact))
             DFSVals.append(DFStime)
             ASTARvals.append(ASTARtime)
 
         # Create a table for the averaged times
-        table = Table(title=f"Time statistics over {runs} runs")
-
-        # Add columns to the table
-        table.add_column("[bold]Algorithm")
-        table.add_column("[bold]Average time")
-        table.add_column("[bold]Minimum time")
-        table.add_column("[bold]Maximum time")
-
-        # Add the various statistics (algorithm, average time, minimum time, maximum time)
-        table.add_row("A*", str(round(sum(ASTARvals)/len(ASTARvals), 7)), str(round(min(ASTARvals),7)), str(round(max(ASTARvals),7)))
-        table.add_row("DFS", str(round(sum(DFSVals)/len(DFSVals), 7)), str(round(min(DFSVals),7)), str(round(max(DFSVals),7)))
-        
+        table = timingTable(runs, {"A*": ASTARvals, "DFS": DFSVals})
+
         # Print the table
         c.print("\n")
         c.print(table)
@@ -367,5 +890,5 @@ if __name__ == "__main__":
         c.print("\n[*] Solutions saved in [purple]/solutions/[white] directory")       
 
     else:
-        solveMaze(adjacencyList, root, goal, mazeFileName, "DFS")
-        solveMaze(adjacencyList, root, goal, mazeFileName, "ASTAR")
\ No newline at end of file
+        solveMaze(adjacencyList, root, goal, mazeFileName, "DFS", metrics=newMetrics(), compact=compact)
+        solveMaze(adjacencyList, root, goal, mazeFileName, "ASTAR", metrics=newMetrics(), compact=compact)
\ No newline at end of file
@@ -0,0 +1,126 @@
+from array import array
+from typing import List, Tuple
+
+import numpy as np
+
+from csrgraph import CSRGraph
+
+# Byte that rows shorter than the longest row are padded with
+PADDING = 0
+
+
+def parseMazeBytes(data: bytes) -> np.ndarray:
+    """
+    Parses the raw contents of a maze file into a 2D array of characters.
+
+    Rows shorter than the longest row are padded with NUL bytes, which never appear in a maze file, so the padding is
+    a wall to the graph builder and can be told apart from the maze when a solution is saved. Surrounding whitespace
+    is stripped in the same way as readMazeFile.
+
+    Args:
+        data (bytes): The contents of the maze file.
+
+    Returns:
+        np.ndarray: A (rows, columns) uint8 array holding the character codes of the maze.
+    """
+    # Normalise line endings and strip the surrounding whitespace
+    buf = np.frombuffer(data.replace(b"\r\n", b"\n").strip(), dtype=np.uint8)
+
+    # Locate the start and end of every row from the newline positions
+    newlines = np.flatnonzero(buf == ord("\n"))
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.concatenate((newlines, [len(buf)]))
+    lengths = ends - starts
+    width = int(lengths.max())
+
+    # Gather every row into a padded 2D grid in a single fancy-indexing pass
+    cols = np.arange(width)
+    inside = cols[None, :] < lengths[:, None]
+    grid = np.full((len(starts), width), PADDING, dtype=np.uint8)
+    grid[inside] = buf[(starts[:, None] + cols[None, :])[inside]]
+
+    return grid
+
+
+def readMazeArray(name: str) -> np.ndarray:
+    """
+    Reads a maze file straight into a 2D array of characters.
+
+    Args:
+        name (str): The filename of the maze file.
+
+    Returns:
+        np.ndarray: A (rows, columns) uint8 array holding the character codes of the maze.
+    """
+    with open(name, "rb") as f:
+        return parseMazeBytes(f.read())
+
+
+def markSolutionArray(grid: np.ndarray, solution: List[Tuple[int, int]]) -> bytes:
+    """
+    Returns the contents of the solution file for a maze read by readMazeArray: the maze with every cell on the
+    solution path marked with an 'X'. The grid itself is not modified.
+
+    Args:
+        grid (np.ndarray): The 2D character array of the maze.
+        solution (list[tuple]): The (x, y) coordinates of the cells on the solution path.
+
+    Returns:
+        bytes: The marked maze, one line per row, without the padding parseMazeBytes added to short rows.
+    """
+    marked = grid.copy()
+    if solution:
+        xs, ys = zip(*solution)
+        marked[list(ys), list(xs)] = ord("X")
+    return b"\n".join(row.tobytes().rstrip(bytes([PADDING])) for row in marked) + b"\n"
+
+
+def _toArray(values: np.ndarray) -> array:
+    # Copy a NumPy integer array into a flat array.array of C ints
+    result = array("i")
+    result.frombytes(values.astype(np.int32).tobytes())
+    return result
+
+
+def buildCSRGraphFromArray(grid: np.ndarray) -> CSRGraph:
+    """
+    Builds a CSRGraph from a 2D character array using whole-array operations only.
+
+    Cells sit on every other column, so the grid is first reduced to its even columns. The up/down/right/left
+    neighbour of every cell is then found by shifting a padded grid of node ids, which keeps the neighbour order
+    identical to returnNeighbours.
+
+    Args:
+        grid (np.ndarray): The 2D character array returned by readMazeArray or parseMazeBytes.
+
+    Returns:
+        CSRGraph: The compact graph representation of the maze.
+    """
+    height, width = grid.shape
+
+    # Open cells on the 2-column stride, one entry per cell
+    openCells = grid[:, ::2] == ord("-")
+    columns = openCells.shape[1]
+
+    # Number the open cells in row-major order, walls get -1
+    ids = np.cumsum(openCells.ravel(), dtype=np.int64) - 1
+    cellIndex = np.where(openCells.ravel(), ids, -1).reshape(height, columns)
+
+    # Pad with walls so the shifted views never fall off the edge of the grid
+    padded = np.full((height + 2, columns + 2), -1, dtype=np.int64)
+    padded[1:-1, 1:-1] = cellIndex
+
+    # Neighbour ids of every open cell in up, down, right, left order
+    candidates = np.stack((
+        padded[:-2, 1:-1][openCells],
+        padded[2:, 1:-1][openCells],
+        padded[1:-1, 2:][openCells],
+        padded[1:-1, :-2][openCells],
+    ), axis=1)
+    present = candidates != -1
+
+    ys, cellColumns = np.nonzero(openCells)
+    offsets = np.concatenate(([0], np.cumsum(present.sum(axis=1))))
+
+    return CSRGraph(_toArray(cellColumns * 2), _toArray(ys), _toArray(offsets), _toArray(candidates[present]),
+                    width, height, _toArray(cellIndex.ravel()))
@@ -0,0 +1,191 @@
+import argparse
+import atexit
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+
+from csrgraph import CSRGraph
+
+# Order in which the arrays of a CSRGraph are laid out in shared memory
+FIELDS = ("xs", "ys", "offsets", "targets", "cellIndex")
+
+
+def publishGraph(graph: CSRGraph) -> Tuple[shared_memory.SharedMemory, dict]:
+    """
+    Copies the arrays of a CSRGraph into a single block of shared memory so worker processes can use the graph
+    without it being pickled for every task.
+
+    Args:
+        graph (CSRGraph): The graph to publish.
+
+    Returns:
+        Tuple[SharedMemory, dict]: The shared memory block, which the caller must close and unlink when finished, and
+        the layout needed by attachGraph to rebuild the graph.
+    """
+    lengths = [len(getattr(graph, field)) for field in FIELDS]
+    itemsize = graph.xs.itemsize
+    block = shared_memory.SharedMemory(create=True, size=max(1, sum(lengths) * itemsize))
+
+    position = 0
+    for field, length in zip(FIELDS, lengths):
+        block.buf[position:position + length * itemsize] = getattr(graph, field).tobytes()
+        position += length * itemsize
+
+    layout = {"name": block.name, "lengths": lengths, "itemsize": itemsize, "width": graph.width, "height": graph.height}
+    return block, layout
+
+
+# Shared memory blocks attached by this worker process and the graphs built over them, keyed by block name
+_attached = {}
+
+
+def attachGraph(layout: dict) -> CSRGraph:
+    """
+    Rebuilds a CSRGraph published by publishGraph, without copying, over memoryviews of the shared memory block.
+    The block stays attached for the life of the worker process, so later tasks on the same graph reuse it, and is
+    detached by detachGraphs when the worker exits.
+
+    Args:
+        layout (dict): The layout returned by publishGraph.
+
+    Returns:
+        CSRGraph: The graph.
+    """
+    name = layout["name"]
+    if not _attached:
+        atexit.register(detachGraphs)
+    if name not in _attached:
+        # The parent process owns the block and unlinks it. Worker processes share the resource tracker of the
+        # parent, so attaching must leave the tracker as it is: unregistering the block here would make the unlink
+        # in the parent fail in the tracker. Attaching only registers the block again, which the tracker ignores,
+        # before Python 3.13, and track=False skips the tracker altogether from 3.13.
+        if sys.version_info >= (3, 13):
+            block = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            block = shared_memory.SharedMemory(name=name)
+
+        views = []
+        position = 0
+        itemsize = layout["itemsize"]
+        for length in layout["lengths"]:
+            views.append(block.buf[position:position + length * itemsize].cast("i"))
+            position += length * itemsize
+        xs, ys, offsets, targets, cellIndex = views
+        _attached[name] = (block, CSRGraph(xs, ys, offsets, targets, layout["width"], layout["height"], cellIndex))
+
+    return _attached[name][1]
+
+
+def detachGraphs() -> None:
+    """
+    Releases the views of every graph attached by this worker process and closes their shared memory blocks. A block
+    cannot be closed while views of it exist, so leaving this to interpreter shutdown fails with a BufferError.
+    """
+    for block, graph in _attached.values():
+        for field in FIELDS:
+            getattr(graph, field).release()
+        block.close()
+    _attached.clear()
+
+
+def solveTask(layout: dict, algorithmType: str, root: Tuple[int, int], goal: Tuple[int, int]) -> Tuple[float, int, frozenset]:
+    """
+    Solves a maze once in a worker process, timing the search and backtrack in the same way as solveMaze. Landmark
+    tables and contracted graphs are loaded from the cache directory, where runParallel has already written them.
+
+    Returns:
+        Tuple[float, int, frozenset]: The time taken in seconds, the number of nodes explored and the cells on the
+        solution path (empty if there is none).
+    """
+    from main import buildPath, loadDerived, selectSolver
+
+    graph = attachGraph(layout)
+    solveFunc, searchRoot, searchGoal = selectSolver(graph, root, goal, algorithmType)
+    loadDerived(graph, layout["maze"], algorithmType)
+
+    start = time.perf_counter()
+    solutionMap, explored = solveFunc(graph, searchRoot, searchGoal)
+    path = buildPath(graph, solutionMap, searchRoot, searchGoal) if solutionMap is not None else set()
+    end = time.perf_counter()
+
+    return end - start, explored, frozenset(path)
+
+
+def runParallel(mazeFiles: List[str], algorithms: List[str], runs: int, workers: int = None) -> Dict[Tuple[str, str], dict]:
+    """
+    Spreads `runs` solves of every algorithm on every maze across a pool of worker processes. Each maze is read and
+    built into a CSRGraph once in this process and published through shared memory.
+
+    Args:
+        mazeFiles (list[str]): The maze files to solve.
+        algorithms (list[str]): The algorithms to run.
+        runs (int): The number of times each algorithm is run on each maze.
+        workers (int, optional): The number of worker processes, defaults to the number of CPUs.
+
+    Returns:
+        dict: For each (maze, algorithm) pair, the graph, the time of every run, and the nodes explored and path of
+        the last run.
+    """
+    from main import buildGraph, findEndpoints, loadDerived, readMazeFile
+
+    blocks = []
+    try:
+        graphs = {}
+        for mazeFileName in mazeFiles:
+            graph = buildGraph(readMazeFile(mazeFileName), "csr")
+            block, layout = publishGraph(graph)
+            blocks.append(block)
+            layout["maze"] = mazeFileName
+            # Write the landmark tables and contracted graphs to the cache directory once, for every worker to read
+            for algorithmType in algorithms:
+                loadDerived(graph, mazeFileName, algorithmType)
+            graphs[mazeFileName] = (graph, layout, findEndpoints(graph))
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for mazeFileName, (graph, layout, (root, goal)) in graphs.items():
+                for algorithmType in algorithms:
+                    futures[(mazeFileName, algorithmType)] = [
+                        executor.submit(solveTask, layout, algorithmType, root, goal) for _ in range(runs)
+                    ]
+
+            results = {}
+            for (mazeFileName, algorithmType), pending in futures.items():
+                outcomes = [future.result() for future in pending]
+                results[(mazeFileName, algorithmType)] = {
+                    "graph": graphs[mazeFileName][0],
+                    "times": [outcome[0] for outcome in outcomes],
+                    "explored": outcomes[-1][1],
+                    "path": outcomes[-1][2],
+                }
+        return results
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+if __name__ == "__main__":
+    from main import ALGORITHMS, c, findMazeFiles, statsTable, timingTable
+
+    parser = argparse.ArgumentParser(description="Run the maze solvers in parallel across worker processes.")
+    parser.add_argument("mazes", nargs="*", help="maze files to solve (default: every maze file in the current directory)")
+    parser.add_argument("-a", "--algorithms", nargs="+", default=["DFS", "ASTAR"], choices=ALGORITHMS)
+    parser.add_argument("-r", "--runs", type=int, default=10, help="number of runs of each algorithm on each maze (default: 10)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="number of worker processes (default: number of CPUs)")
+    args = parser.parse_args()
+
+    mazeFiles = args.mazes or sorted(findMazeFiles())
+    start = time.perf_counter()
+    results = runParallel(mazeFiles, args.algorithms, args.runs, args.workers)
+    c.print(f"[*] {len(mazeFiles) * len(args.algorithms) * args.runs} solves finished in {round(time.perf_counter() - start, 5)} seconds")
+
+    for mazeFileName in mazeFiles:
+        c.print(f"\n[*] Results for {mazeFileName}:\n")
+        c.print(timingTable(args.runs, {algorithmType: results[(mazeFileName, algorithmType)]["times"] for algorithmType in args.algorithms}))
+        for algorithmType in args.algorithms:
+            result = results[(mazeFileName, algorithmType)]
+            meanTime = sum(result["times"]) / len(result["times"])
+            c.print(statsTable(f"{algorithmType} on {mazeFileName}", result["explored"], result["graph"], result["path"], 0, meanTime))
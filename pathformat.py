@@ -0,0 +1,112 @@
+import re
+from typing import List, Tuple
+
+# Header line identifying a compact solution file and the version of the format
+HEADER = "maze-path 1"
+
+# Move letters and the (dx, dy) step each one stands for. Cells sit on every other column, so a horizontal step
+# moves 2 columns.
+MOVES = {"U": (0, -1), "D": (0, 1), "R": (2, 0), "L": (-2, 0)}
+STEPS = {step: move for move, step in MOVES.items()}
+
+RUN = re.compile(r"([UDRL])(\d+)")
+
+
+def encodePath(path: List[Tuple[int, int]]) -> str:
+    """
+    Encodes an ordered path as its start cell followed by run-length encoded moves, e.g. "2 0 D1R3D12".
+
+    Args:
+        path (list[tuple]): The cells on the path in order, each one step from the one before.
+
+    Returns:
+        str: The encoded path.
+
+    Raises:
+        ValueError: If the path is empty or two consecutive cells are not neighbours.
+    """
+    if not path:
+        raise ValueError("Cannot encode an empty path")
+
+    runs = []
+    move, length = None, 0
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
+        step = STEPS.get((x2 - x1, y2 - y1))
+        if step is None:
+            raise ValueError(f"Cells {(x1, y1)} and {(x2, y2)} on the path are not neighbours")
+        if step == move:
+            length += 1
+        else:
+            if move is not None:
+                runs.append(f"{move}{length}")
+            move, length = step, 1
+    if move is not None:
+        runs.append(f"{move}{length}")
+
+    x, y = path[0]
+    return f"{x} {y} {''.join(runs)}".rstrip()
+
+
+def decodePath(encoded: str) -> List[Tuple[int, int]]:
+    """
+    Decodes a path encoded by encodePath back into the ordered list of cells.
+
+    Args:
+        encoded (str): The encoded path.
+
+    Returns:
+        list[tuple]: The cells on the path in order.
+
+    Raises:
+        ValueError: If the encoded path is malformed.
+    """
+    fields = encoded.split()
+    if len(fields) not in (2, 3):
+        raise ValueError(f"Malformed path '{encoded}'")
+    x, y = int(fields[0]), int(fields[1])
+    moves = fields[2] if len(fields) == 3 else ""
+
+    # Every character of the moves must belong to a run
+    runs = RUN.findall(moves)
+    if sum(len(move) + len(length) for move, length in runs) != len(moves):
+        raise ValueError(f"Malformed moves '{moves}'")
+
+    path = [(x, y)]
+    for move, length in runs:
+        dx, dy = MOVES[move]
+        for _ in range(int(length)):
+            x, y = x + dx, y + dy
+            path.append((x, y))
+    return path
+
+
+def writeCompactSolution(fileName: str, path: List[Tuple[int, int]]) -> None:
+    """
+    Saves an ordered path in the compact format: a header line followed by the encoded path.
+
+    Args:
+        fileName (str): The name of the file to write.
+        path (list[tuple]): The cells on the path in order.
+    """
+    with open(fileName, "w") as file:
+        file.write(f"{HEADER}\n{encodePath(path)}\n")
+
+
+def readCompactSolution(fileName: str) -> List[Tuple[int, int]]:
+    """
+    Loads a path saved by writeCompactSolution.
+
+    Args:
+        fileName (str): The name of the file to read.
+
+    Returns:
+        list[tuple]: The cells on the path in order.
+
+    Raises:
+        ValueError: If the file is not a compact solution file.
+    """
+    with open(fileName) as file:
+        header = file.readline().strip()
+        if header != HEADER:
+            raise ValueError(f"{fileName} is not a compact solution file")
+        return decodePath(file.read())
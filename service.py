@@ -0,0 +1,395 @@
+import argparse
+import json
+import os
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from adjacency import forgetDerived
+from components import mayBeConnected
+from hierarchy import updateTileAbstraction
+from incremental import IncrementalPlanner, setCell
+from main import buildGraph, buildPath, findEndpoints, loadDerived, readMaze, selectSolver
+from stepping import runSteps, solverSteps
+
+
+class SolveResult(NamedTuple):
+    """
+    The answer to a single query.
+    """
+    path: Optional[FrozenSet[Tuple[int, int]]]  # the cells on the solution path, None if there is no path
+    nodesExplored: int  # nodes explored by the search that answered the query
+    cached: bool  # whether the answer came from the result cache
+    seconds: float  # time taken to answer the query
+
+
+class ReadWriteLock:
+    """
+    A lock which any number of readers can hold at once, or a single writer on its own. Waiting writers go before new
+    readers, so a steady stream of queries cannot hold off a change to the maze.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.readers = 0
+        self.writer = False
+        self.waitingWriters = 0
+
+    @contextmanager
+    def reading(self) -> Iterator[None]:
+        with self.condition:
+            self.condition.wait_for(lambda: not self.writer and not self.waitingWriters)
+            self.readers += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.readers -= 1
+                if not self.readers:
+                    self.condition.notify_all()
+
+    @contextmanager
+    def writing(self) -> Iterator[None]:
+        with self.condition:
+            self.waitingWriters += 1
+            self.condition.wait_for(lambda: not self.writer and not self.readers)
+            self.waitingWriters -= 1
+            self.writer = True
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.writer = False
+                self.condition.notify_all()
+
+
+class LoadedMaze:
+    """
+    A maze held in memory by the service: the maze itself, its graph and default endpoints, the modification time of
+    the file it was loaded from, and the incremental planners answering LPASTAR queries on it, keyed by root and goal.
+
+    Searches hold the lock of the maze for reading, so queries on the same maze run side by side, while changing a
+    cell, and the searches which update what they keep on the maze (LPASTAR and HPASTAR), hold it for writing.
+    version counts the changes made to the maze, so a result found before a change is never cached after it, and
+    released is set once the service has replaced or evicted the maze (see release).
+    """
+
+    def __init__(self, mazeFileName: str, backend: str):
+        self.mtime = os.path.getmtime(mazeFileName)
+        self.backend = backend
+        self.maze = readMaze(mazeFileName, backend)
+        self.adjacencyList = buildGraph(self.maze, backend)
+        self.root, self.goal = findEndpoints(self.adjacencyList)
+        self.planners = {}
+        self.lock = ReadWriteLock()
+        self.version = 0
+        self.released = False
+
+    def release(self) -> None:
+        """
+        Releases what the maze holds once the service no longer uses it. Searches still running on it are waited for,
+        then what the solvers built from the graph is forgotten and the memory-mapped maze of the mmap and cache
+        backends is closed. Queries which looked the maze up before it was released look it up again.
+        """
+        with self.lock.writing():
+            self.released = True
+            self.planners.clear()
+            forgetDerived(self.adjacencyList)
+            if hasattr(self.maze, "close"):
+                self.maze.close()
+
+
+class SolverService:
+    """
+    A long-lived solver which loads and builds each maze once and answers many root/goal queries against it.
+
+    Solved paths are kept in a least recently used cache bounded both by the number of entries and by the total
+    number of path cells held, so repeated queries are answered without searching. A maze whose file changes on disk
+    is reloaded, and its cached paths dropped, the next time it is queried.
+
+    The service lock only guards the loaded mazes, the cache and the counters; searches run outside it under the lock
+    of their maze, so a long search never holds up queries on other mazes or answers from the cache. Mazes are read
+    and built outside it too, under a loading lock of their own, so loading a large maze only holds up the queries
+    waiting for that maze.
+    """
+
+    def __init__(self, backend: str = "dict", cacheEntries: int = 1024, cacheCells: int = 10_000_000):
+        self.backend = backend
+        self.cacheEntries = cacheEntries
+        self.cacheCells = cacheCells
+        self.mazes = {}
+        self.results = OrderedDict()
+        self.cachedCells = 0
+        self.hits = 0
+        self.misses = 0
+        # Queries may arrive from several server threads at once
+        self.lock = threading.RLock()
+        # A lock for each maze file, held while the maze is loaded so two threads never build the same maze
+        self.loading = {}
+
+    def load(self, mazeFileName: str) -> LoadedMaze:
+        """
+        Returns the loaded maze for a file, loading it on first use or when the file has changed since it was loaded.
+
+        The maze is read and built without holding the service lock, under the loading lock of the file, so other
+        threads asking for the same maze wait for it to be built once while queries on other mazes carry on. A maze
+        replaced by a newer copy of its file is released.
+
+        Args:
+            mazeFileName (str): The name of the maze file.
+
+        Returns:
+            LoadedMaze: The maze held by the service.
+        """
+        key = os.path.abspath(mazeFileName)
+        mtime = os.path.getmtime(mazeFileName)
+        with self.lock:
+            loaded = self.mazes.get(key)
+            if loaded is not None and loaded.mtime == mtime:
+                return loaded
+            loading = self.loading.setdefault(key, threading.Lock())
+
+        with loading:
+            # Another thread may have loaded the maze while this one waited
+            mtime = os.path.getmtime(mazeFileName)
+            with self.lock:
+                loaded = self.mazes.get(key)
+            if loaded is not None and loaded.mtime == mtime:
+                return loaded
+
+            fresh = LoadedMaze(mazeFileName, self.backend)
+            with self.lock:
+                self.mazes[key] = fresh
+                if loaded is not None:
+                    self.forgetResults(key)
+        if loaded is not None:
+            loaded.release()
+        return fresh
+
+    def evict(self, mazeKey: str) -> None:
+        """
+        Forgets a loaded maze and every cached result for it, and releases the maze.
+        """
+        with self.lock:
+            loaded = self.mazes.pop(mazeKey, None)
+            self.forgetResults(mazeKey)
+        if loaded is not None:
+            loaded.release()
+
+    def forgetResults(self, mazeKey: str) -> None:
+        """
+        Forgets every cached result for a maze.
+        """
+        with self.lock:
+            for key in [key for key in self.results if key[0] == mazeKey]:
+                self.cachedCells -= len(self.results.pop(key).path or ())
+
+    def setCell(self, mazeFileName: str, x: int, y: int, isOpen: bool) -> List[Tuple[int, int]]:
+        """
+        Opens or closes a cell of a loaded maze in memory, the maze file itself is not changed. The graph is updated
+        in place, cached results for the maze are dropped, and the incremental planners of the maze are told which
+        cells changed so their next LPASTAR query repairs the previous solution instead of starting again. Likewise
+        only the HPASTAR tiles around the changed cells are rebuilt.
+
+        Args:
+            mazeFileName (str): The name of the maze file.
+            x (int): The x-coordinate of the cell.
+            y (int): The y-coordinate of the cell.
+            isOpen (bool): True to open the cell, False to close it.
+
+        Returns:
+            list[tuple]: The cells whose neighbours changed.
+
+        Raises:
+            ValueError: If the maze was not loaded with the dict backend, or (x, y) is not a cell of the maze.
+        """
+        while True:
+            loaded = self.load(mazeFileName)
+            if loaded.backend != "dict":
+                raise ValueError("Cells can only be changed in mazes loaded with the dict backend")
+
+            with loaded.lock.writing():
+                if loaded.released:
+                    # The maze was reloaded since it was looked up, so change the new copy instead
+                    continue
+                changed = setCell(loaded.maze, loaded.adjacencyList, x, y, isOpen)
+                if changed:
+                    loaded.version += 1
+                    for planner in loaded.planners.values():
+                        planner.cellsChanged(changed)
+                    updateTileAbstraction(loaded.adjacencyList, changed)
+                    # The contracted graph, packed maze and landmark table built from the old maze are out of date
+                    forgetDerived(loaded.adjacencyList, "contracted", "packed", "landmarks")
+            break
+        if changed:
+            self.forgetResults(os.path.abspath(mazeFileName))
+        return changed
+
+    def solve(self, mazeFileName: str, root: Tuple[int, int] = None, goal: Tuple[int, int] = None,
+              algorithmType: str = "ASTAR", timeout: float = None) -> SolveResult:
+        """
+        Answers a single query, from the cache if the same query has been answered before.
+
+        Args:
+            mazeFileName (str): The name of the maze file.
+            root (tuple, optional): The starting node, defaults to the first node of the maze.
+            goal (tuple, optional): The goal node, defaults to the last node of the maze.
+            algorithmType (str): The algorithm to use, one of main.ALGORITHMS.
+            timeout (float, optional): The number of seconds the search may take. Only the steppable algorithms
+              (stepping.STEPPABLE) can be given a timeout.
+
+        Returns:
+            SolveResult: The answer to the query.
+
+        Raises:
+            SearchTimeout: If the search takes longer than the timeout, the result is then not cached.
+        """
+        start = time.perf_counter()
+        requestedRoot, requestedGoal = root, goal
+        while True:
+            loaded = self.load(mazeFileName)
+            with self.lock:
+                root = tuple(requestedRoot) if requestedRoot is not None else loaded.root
+                goal = tuple(requestedGoal) if requestedGoal is not None else loaded.goal
+                key = (os.path.abspath(mazeFileName), root, goal, algorithmType)
+
+                cached = self.results.get(key)
+                if cached is not None:
+                    self.results.move_to_end(key)
+                    self.hits += 1
+                    return cached._replace(cached=True, seconds=time.perf_counter() - start)
+                self.misses += 1
+
+            # LPASTAR keeps its planners on the maze and HPASTAR builds tiles as it goes, so they search on their own
+            exclusive = algorithmType in ("LPASTAR", "HPASTAR")
+            with loaded.lock.writing() if exclusive else loaded.lock.reading():
+                if loaded.released:
+                    # The maze was reloaded since it was looked up, so ask the new copy instead
+                    continue
+                version = loaded.version
+                if not mayBeConnected(loaded.adjacencyList, root, goal):
+                    # The root and goal are in different components, so the answer is known without searching
+                    searchRoot, searchGoal = root, goal
+                    solutionMap, explored = None, 0
+                elif algorithmType == "LPASTAR":
+                    # Keep the planner between queries so it can repair its solution after cells change
+                    searchRoot, searchGoal = root, goal
+                    planner = loaded.planners.get((root, goal))
+                    if planner is None:
+                        planner = loaded.planners[(root, goal)] = IncrementalPlanner(loaded.adjacencyList, root, goal)
+                    solutionMap, explored = planner.solve()
+                elif timeout is not None:
+                    # Search through the coordinate interface of the graph, pausing to check the deadline. The time
+                    # spent loading the maze counts against the timeout too.
+                    searchRoot, searchGoal = root, goal
+                    steps = solverSteps(algorithmType, loaded.adjacencyList, root, goal)
+                    solutionMap, explored = runSteps(steps, max(0.0, timeout - (time.perf_counter() - start)))
+                else:
+                    solveFunc, searchRoot, searchGoal = selectSolver(loaded.adjacencyList, root, goal, algorithmType,
+                                                                     loaded.maze)
+                    if not version:
+                        # The maze still matches its file, so what the solver builds from it can come from the cache
+                        loadDerived(loaded.adjacencyList, mazeFileName, algorithmType)
+                    solutionMap, explored = solveFunc(loaded.adjacencyList, searchRoot, searchGoal)
+                path = None
+                if solutionMap is not None:
+                    path = frozenset(buildPath(loaded.adjacencyList, solutionMap, searchRoot, searchGoal))
+            break
+
+        result = SolveResult(path, explored, False, time.perf_counter() - start)
+        with self.lock:
+            # Only cache the result if the maze was neither reloaded nor changed while it was being searched
+            if self.mazes.get(key[0]) is loaded and loaded.version == version:
+                self.remember(key, result)
+        return result
+
+    def remember(self, key: tuple, result: SolveResult) -> None:
+        """
+        Adds a result to the cache, evicting the least recently used results until it fits within its bounds.
+        """
+        size = len(result.path or ())
+        if size > self.cacheCells:
+            return
+        self.results[key] = result
+        self.cachedCells += size
+        while len(self.results) > self.cacheEntries or self.cachedCells > self.cacheCells:
+            _, evicted = self.results.popitem(last=False)
+            self.cachedCells -= len(evicted.path or ())
+
+    def solveBatch(self, queries: Iterable[Tuple[str, Tuple[int, int], Tuple[int, int], str]]) -> List[SolveResult]:
+        """
+        Answers a batch of (maze, root, goal, algorithm) queries in order.
+
+        Args:
+            queries (iterable): The queries, a root or goal of None selects the default endpoint of the maze.
+
+        Returns:
+            list[SolveResult]: The answer to each query.
+        """
+        return [self.solve(mazeFileName, root, goal, algorithmType) for mazeFileName, root, goal, algorithmType in queries]
+
+
+class ServiceRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Answers queries sent as JSON Lines over a socket. Each request line holds "maze" and optionally "root", "goal",
+    "algorithm" and "timeout" (in seconds); each response line holds the path, nodes explored, whether it was cached
+    and the time taken, or an "error" message. A request line holding "maze", "cell" and "open" opens or closes a cell instead, and its
+    response holds the cells whose neighbours changed.
+    """
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                query = json.loads(line)
+                if "cell" in query:
+                    changed = self.server.service.setCell(query["maze"], *query["cell"], bool(query["open"]))
+                    self.wfile.write((json.dumps({"changed": changed}) + "\n").encode())
+                    continue
+                result = self.server.service.solve(query["maze"], query.get("root"), query.get("goal"),
+                                                   query.get("algorithm", "ASTAR"), query.get("timeout"))
+                response = {
+                    "path": sorted(result.path) if result.path is not None else None,
+                    "nodesExplored": result.nodesExplored,
+                    "cached": result.cached,
+                    "seconds": result.seconds,
+                }
+            except Exception as e:
+                response = {"error": str(e)}
+            self.wfile.write((json.dumps(response) + "\n").encode())
+
+
+class ServiceServer(socketserver.ThreadingTCPServer):
+    # Connections are handled on daemon threads so open connections never keep the process alive
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def serve(service: SolverService, host: str = "127.0.0.1", port: int = 8765) -> None:
+    """
+    Serves queries to a SolverService over TCP until interrupted.
+    """
+    with ServiceServer((host, port), ServiceRequestHandler) as server:
+        server.service = service
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve maze queries as JSON Lines over a local socket.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("-b", "--backend", default="dict", help="graph backend to build mazes with (default: dict)")
+    parser.add_argument("--cache-entries", type=int, default=1024, help="maximum number of cached paths (default: 1024)")
+    parser.add_argument("--cache-cells", type=int, default=10_000_000, help="maximum number of path cells cached (default: 10000000)")
+    parser.add_argument("--preload", nargs="*", default=[], help="maze files to load before serving")
+    args = parser.parse_args()
+
+    service = SolverService(args.backend, args.cache_entries, args.cache_cells)
+    for mazeFileName in args.preload:
+        service.load(mazeFileName)
+    print(f"[*] Serving on {args.host}:{args.port}")
+    serve(service, args.host, args.port)
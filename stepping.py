@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Generator, Optional, Tuple
+
+from astar import aStarSolverSteps
+from dfs import depthFirstSearchSteps
+from instrumentation import Progress
+
+# The steppable solvers, keyed by the name of the algorithm they step through
+STEPPABLE = {
+    "ASTAR": aStarSolverSteps,
+    "DFS": depthFirstSearchSteps,
+}
+
+Steps = Generator[Progress, None, Tuple[Optional[Dict], int]]
+
+
+class CancellationToken:
+    """
+    Lets one part of a program ask a search running elsewhere (in another thread or asyncio task) to stop at its next
+    pause.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class SearchCancelled(Exception):
+    """
+    Raised when a search is stopped by its cancellation token, holding the progress it had made.
+    """
+
+    def __init__(self, message: str, progress: Progress):
+        super().__init__(message)
+        self.progress = progress
+
+
+class SearchTimeout(SearchCancelled):
+    """
+    Raised when a search runs past its deadline, holding the progress it had made.
+    """
+
+
+def solverSteps(algorithmType: str, adjacencyList, root: Tuple[int, int], goal: Tuple[int, int],
+                every: int = 1000) -> Steps:
+    """
+    Starts a steppable search with the given algorithm.
+
+    Args:
+        algorithmType (str): The algorithm to use, one of STEPPABLE.
+        adjacencyList: The graph of the maze, searched through its coordinate interface.
+        root (tuple): The node to start the search from.
+        goal (tuple): The node to search for.
+        every (int): The number of nodes to explore between pauses.
+
+    Returns:
+        The generator stepping through the search.
+
+    Raises:
+        ValueError: If the algorithm has no steppable version.
+    """
+    if algorithmType not in STEPPABLE:
+        raise ValueError(f"Algorithm '{algorithmType}' cannot be stepped, use one of {', '.join(STEPPABLE)}")
+    return STEPPABLE[algorithmType](adjacencyList, root, goal, every)
+
+
+def _check(steps: Steps, progress: Progress, deadline: Optional[float], token: Optional[CancellationToken]) -> None:
+    # Stop the search if it has been cancelled or has run out of time
+    if token is not None and token.cancelled:
+        steps.close()
+        raise SearchCancelled(f"Search cancelled after exploring {progress.nodesExplored} nodes", progress)
+    if deadline is not None and time.monotonic() >= deadline:
+        steps.close()
+        raise SearchTimeout(f"Search timed out after exploring {progress.nodesExplored} nodes", progress)
+
+
+def runSteps(steps: Steps, timeout: float = None, token: CancellationToken = None,
+             onProgress: Callable[[Progress], None] = None) -> Tuple[Optional[Dict], int]:
+    """
+    Runs a steppable search to the end, checking the deadline and cancellation token at every pause.
+
+    Args:
+        steps: The generator returned by solverSteps or one of the steppable solvers.
+        timeout (float, optional): The number of seconds the search may run for.
+        token (CancellationToken, optional): A token which stops the search when cancelled.
+        onProgress (callable, optional): Called with the Progress of the search at every pause.
+
+    Returns:
+        The (cameFrom, nodesExplored) result of the solver.
+
+    Raises:
+        SearchTimeout: If the search runs past the timeout.
+        SearchCancelled: If the token is cancelled.
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    try:
+        while True:
+            progress = next(steps)
+            if onProgress is not None:
+                onProgress(progress)
+            _check(steps, progress, deadline, token)
+    except StopIteration as finished:
+        return finished.value
+
+
+async def runStepsAsync(steps: Steps, timeout: float = None, token: CancellationToken = None,
+                        onProgress: Callable[[Progress], None] = None) -> Tuple[Optional[Dict], int]:
+    """
+    Runs a steppable search on the event loop, giving control back to the loop at every pause so many searches (and
+    other tasks) are interleaved fairly. Cancelling the asyncio task running the search also stops it.
+
+    Takes the same arguments, returns the same result and raises the same exceptions as runSteps.
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    try:
+        while True:
+            progress = next(steps)
+            if onProgress is not None:
+                onProgress(progress)
+            _check(steps, progress, deadline, token)
+            await asyncio.sleep(0)
+    except StopIteration as finished:
+        return finished.value
+    finally:
+        steps.close()